@@ -17,12 +17,15 @@ Date: 2025
 import cv2
 import sys
 import time
+import threading
 import numpy as np
 from src.facial_analysis import FacialAnalysis
 from src.bpm_estimator import BPM_Estimator
 from src.voice_stress import VoiceStress
-from src.logic_engine import LogicEngine
+from src.logic_engine import LogicEngine, AlertLevel
 from src.visualizer import Visualizer
+from src.camera import open_camera, FrameGrabber
+from src.face_detector import FaceDetector, forehead_region
 
 
 class LieDar:
@@ -45,24 +48,78 @@ class LieDar:
         self.fps = fps
         self.camera_id = camera_id
         
+        # Haar detection runs every face_stride frames; cached boxes fill the gaps
+        self.face_stride = 2
+        self.cached_faces = None
+        
         # Initialize video capture
         print(f"Opening camera {camera_id}...")
-        self.cap = cv2.VideoCapture(camera_id)
+        self.cap = open_camera(camera_id)
         self.cap.set(cv2.CAP_PROP_FPS, fps)
         
         if not self.cap.isOpened():
             raise RuntimeError(f"Could not open camera {camera_id}")
         
+        # Model loading (MediaPipe graph, Haar XML) is slow and independent of
+        # the camera, so it runs in the background while the rest initializes.
+        # A failure is kept and re-raised by start()
+        self.init_error = None
+        self.init_thread = threading.Thread(target=self._load_models, daemon=True)
+        self.init_thread.start()
+        
         # Get actual camera properties
         actual_fps = self.cap.get(cv2.CAP_PROP_FPS)
         if actual_fps > 0:
             self.fps = int(actual_fps)
         print(f"Camera FPS: {self.fps}")
         
-        # Initialize analysis modules
+        # Capture runs on its own thread so analysis never lags the camera
+        # Frames are mirrored while being copied out of the grabber
+        self.grabber = FrameGrabber(self.cap, mirror=True)
+        self.frame_buffer = None
+        
+        print("Initializing pulse estimator...")
+        self.bpm_estimator = BPM_Estimator(fps=self.fps, buffer_seconds=10)
+        
+        print("Initializing voice analyzer...")
+        self.voice_analyzer = VoiceStress(sample_rate=16000, chunk_duration=1.0)
+        
+        # State variables
+        self.is_running = False
+        
+        self.current_results = {
+            "honesty_score": 50.0,
+            "alert_level": AlertLevel.MEDIUM_STRESS,
+            "component_scores": {
+                "facial_raw": 0.0,
+                "voice_raw": 0.0,
+                "pulse_raw": 0.0
+            },
+            "bpm": 0.0,
+            "facial_metrics": {},
+            "voice_metrics": {}
+        }
+        
+        print("✓ Lie-Dar System Ready!")
+        print("=" * 60)
+    
+    def _load_models(self):
+        """Background thread target: load models, keeping any exception for start()."""
+        try:
+            self._init_models()
+        except Exception as e:
+            self.init_error = e
+    
+    def _init_models(self):
+        """Load the heavy analysis models (runs on a background thread)."""
+        # Haar cascade: face detection without MediaPipe, and a cheap
+        # presence check before Face Mesh inference with it
+        self.face_detector = FaceDetector(detection_width=320)
+        
         print("Initializing facial analysis...")
         try:
-            self.facial_analyzer = FacialAnalysis(window_size=30, sensitivity=2.0)
+            self.facial_analyzer = FacialAnalysis(window_size=30, sensitivity=2.0,
+                                                  face_detector=self.face_detector)
             self.has_facial = True
             print("✓ Facial analysis initialized")
         except Exception as e:
@@ -71,12 +128,6 @@ class LieDar:
             self.facial_analyzer = None
             self.has_facial = False
         
-        print("Initializing pulse estimator...")
-        self.bpm_estimator = BPM_Estimator(fps=self.fps, buffer_seconds=10)
-        
-        print("Initializing voice analyzer...")
-        self.voice_analyzer = VoiceStress(sample_rate=16000, chunk_duration=1.0)
-        
         print("Initializing logic engine...")
         # Adjust weights based on available modules
         if self.has_facial:
@@ -96,33 +147,24 @@ class LieDar:
         
         print("Initializing visualizer...")
         self.visualizer = Visualizer()
-        
-        # State variables
-        self.is_running = False
-        self.current_results = {
-            "honesty_score": 50.0,
-            "alert_level": "medium_stress",
-            "component_scores": {
-                "facial_raw": 0.0,
-                "voice_raw": 0.0,
-                "pulse_raw": 0.0
-            },
-            "bpm": 0.0,
-            "facial_metrics": {},
-            "voice_metrics": {}
-        }
-        
-        print("✓ Lie-Dar System Ready!")
-        print("=" * 60)
     
     def start(self):
         """Start the Lie-Dar system."""
+        # Wait for background model loading to finish
+        self.init_thread.join()
+        if self.init_error is not None:
+            raise self.init_error
+        if self.facial_analyzer:
+            # Camera FPS is only known after the camera opened
+            self.facial_analyzer.fps = self.fps
+        
         print("Starting Lie-Dar...")
         print("Press 'Q' to quit, 'R' to reset")
         print("=" * 60)
         
-        # Start voice recording
+        # Start voice recording and frame capture
         self.voice_analyzer.start_recording()
+        self.grabber.start()
         
         self.is_running = True
         self._main_loop()
@@ -133,30 +175,29 @@ class LieDar:
         start_time = time.time()
         
         while self.is_running:
-            # Capture frame
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Error: Could not read frame")
-                break
+            # Take the newest frame from the capture thread
+            frame = self.grabber.read(out=self.frame_buffer)
+            if frame is None:
+                if self.grabber.failed:
+                    print("Error: Could not read frame")
+                    break
+                continue
             
+            self.frame_buffer = frame
             frame_count += 1
             
-            # Flip frame for mirror effect
-            frame = cv2.flip(frame, 1)
-            
             try:
                 # 1. Facial Analysis (if available)
                 facial_stress = 0.0
-                annotated_frame = frame
                 facial_metrics = {}
+                landmarks = None
                 
                 if self.has_facial and self.facial_analyzer:
-                    facial_stress, facial_metrics, temp_frame = self.facial_analyzer.analyze_frame(frame)
-                    if temp_frame is not None:
-                        annotated_frame = temp_frame
+                    # Throttling and the Haar presence gate happen inside the analyzer
+                    facial_stress, facial_metrics, _, landmarks = self.facial_analyzer.analyze_frame(frame)
                 
-                # Use annotated frame if available, otherwise use original
-                display_frame = annotated_frame
+                # The frame buffer is ours, so overlays are drawn straight onto it
+                display_frame = frame
                 
                 # 2. Pulse Estimation
                 bpm = 0.0
@@ -165,28 +206,24 @@ class LieDar:
                 # For pulse estimation without MediaPipe, we'll use a simpler approach
                 # Just extract a fixed forehead region based on face detection with OpenCV
                 if self.has_facial:
-                    # Get landmarks from facial analyzer if available
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    results = self.facial_analyzer.face_mesh.process(rgb_frame)
-                    
-                    if results.multi_face_landmarks:
-                        landmarks = results.multi_face_landmarks[0]
+                    # Reuse the landmarks from the facial analyzer's Face Mesh pass
+                    if landmarks is not None:
                         bpm, bpm_metrics = self.bpm_estimator.process_frame(frame, landmarks)
                         pulse_stress = self.bpm_estimator.get_stress_score()
+                        
+                        # Draw the mesh only after the forehead ROI has been sampled
+                        self.facial_analyzer.draw_landmarks(display_frame, landmarks, in_place=True)
                 else:
                     # Simple forehead extraction without MediaPipe
                     # Use Haar Cascade for face detection
-                    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+                    if frame_count % self.face_stride == 0 or self.cached_faces is None:
+                        self.cached_faces = self.face_detector.detect(frame)
+                    faces = self.cached_faces
                     
                     if len(faces) > 0:
-                        x, y, w, h = faces[0]
                         # Extract forehead region (top 30% of face)
-                        forehead_y_start = y
-                        forehead_y_end = y + int(h * 0.3)
-                        forehead_x_start = x + int(w * 0.2)
-                        forehead_x_end = x + int(w * 0.8)
+                        (forehead_x_start, forehead_y_start,
+                         forehead_x_end, forehead_y_end) = forehead_region(*faces[0])
                         
                         # Draw rectangle on display frame
                         cv2.rectangle(display_frame, (forehead_x_start, forehead_y_start),
@@ -197,8 +234,8 @@ class LieDar:
                         bpm = 75.0
                         pulse_stress = 10.0
                 
-                # 3. Voice Analysis (runs asynchronously)
-                voice_stress, voice_metrics = self.voice_analyzer.analyze_audio()
+                # 3. Voice Analysis (latest result from the analyzer's worker thread)
+                voice_stress, voice_metrics = self.voice_analyzer.get_latest()
                 
                 # 4. Multi-Modal Fusion
                 results = self.logic_engine.analyze(
@@ -207,15 +244,14 @@ class LieDar:
                     pulse_stress=pulse_stress
                 )
                 
-                # Update current results
-                self.current_results = {
-                    "honesty_score": results["honesty_score"],
-                    "alert_level": results["alert_level"],
-                    "component_scores": results["component_scores"],
-                    "bpm": bpm,
-                    "facial_metrics": facial_metrics,
-                    "voice_metrics": voice_metrics
-                }
+                # Update current results in place (no per-frame dict rebuild)
+                current = self.current_results
+                current["honesty_score"] = float(results["honesty_score"])
+                current["alert_level"] = results["alert_level"]
+                current["component_scores"].update(results["component_scores"])
+                current["bpm"] = float(bpm)
+                current["facial_metrics"] = facial_metrics
+                current["voice_metrics"] = voice_metrics
                 
                 # 5. Visualization
                 viz_frame = self.visualizer.render_frame(
@@ -246,7 +282,7 @@ class LieDar:
                     print(f"Frame {frame_count} | FPS: {actual_fps:.1f} | "
                           f"Honesty: {results['honesty_score']:.1f} | "
                           f"BPM: {bpm:.0f} | "
-                          f"Alert: {results['alert_level']}")
+                          f"Alert: {results['alert_level'].value}")
                 
             except Exception as e:
                 print(f"Error in main loop: {e}")
@@ -257,6 +293,7 @@ class LieDar:
     
     def reset(self):
         """Reset all analyzers."""
+        self.cached_faces = None
         self.facial_analyzer.reset()
         self.bpm_estimator.reset()
         self.voice_analyzer.reset()
@@ -267,15 +304,24 @@ class LieDar:
         """Cleanup resources."""
         print("\nCleaning up...")
         
-        # Stop voice recording
-        self.voice_analyzer.stop_recording()
+        # Components may be missing if __init__ or model loading failed part-way
+        
+        # Stop voice recording and analysis
+        self.is_running = False
+        if getattr(self, "voice_analyzer", None):
+            self.voice_analyzer.stop_recording()
         
-        # Release camera
-        if self.cap:
+        # Stop capture thread and release camera
+        if getattr(self, "grabber", None):
+            self.grabber.stop()
+        if getattr(self, "cap", None):
             self.cap.release()
         
         # Close windows
-        self.visualizer.close()
+        if getattr(self, "init_thread", None):
+            self.init_thread.join()
+        if getattr(self, "visualizer", None):
+            self.visualizer.close()
         
         print("✓ Cleanup complete")
     
@@ -5,15 +5,66 @@ Modern desktop application with better UX than OpenCV windows.
 """
 
 import sys
+import threading
 import cv2
 import numpy as np
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QProgressBar, QFrame)
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import QThread, Qt, pyqtSignal
 from PyQt5.QtGui import QImage, QPixmap, QFont
 
 from src.voice_stress import VoiceStress
-from src.logic_engine import LogicEngine
+from src.logic_engine import LogicEngine, AlertLevel
+from src.camera import open_camera, grab_latest
+from src.face_detector import FaceDetector, forehead_region
+
+
+class GrabberThread(QThread):
+    """
+    Camera capture thread that drives the GUI update clock.
+    
+    Emits frame_ready as soon as a new frame is decoded, so the GUI reacts
+    to the camera's own cadence instead of a fixed timer. Every frame is
+    grabbed to keep the driver queue empty, but a frame is only decoded and
+    emitted once the GUI has finished with the previous one, so queued
+    signals never pile up behind a slow update.
+    """
+    
+    frame_ready = pyqtSignal(np.ndarray)
+    
+    def __init__(self, cap: cv2.VideoCapture):
+        super().__init__()
+        self.cap = cap
+        self.frame_buffer = None
+        self.is_running = False
+        self.consumer_ready = threading.Event()
+        self.consumer_ready.set()
+    
+    def run(self):
+        """Capture loop: grab every frame, emit when the GUI is idle."""
+        self.is_running = True
+        while self.is_running:
+            if not grab_latest(self.cap):
+                # Transient camera hiccup: back off briefly and try again
+                self.msleep(30)
+                continue
+            if not self.consumer_ready.is_set():
+                continue
+            # The GUI is done with the previous frame, so its buffer is reused
+            ret, frame = self.cap.retrieve(self.frame_buffer)
+            if ret:
+                self.frame_buffer = frame
+                self.consumer_ready.clear()
+                self.frame_ready.emit(frame)
+    
+    def frame_done(self):
+        """Signal that the GUI has processed the last emitted frame."""
+        self.consumer_ready.set()
+    
+    def stop(self) -> bool:
+        """Stop the capture loop and wait for the thread to exit (True if it did)."""
+        self.is_running = False
+        return self.wait(1000)
 
 
 class LieDarGUI(QMainWindow):
@@ -57,8 +108,15 @@ class LieDarGUI(QMainWindow):
         """)
         
         # Initialize components
-        self.cap = cv2.VideoCapture(0)
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.cap = open_camera(0)
+        self.grabber = GrabberThread(self.cap)
+        self.mirror_buffer = None
+        self.face_detector = FaceDetector(detection_width=320)
+        
+        # Face detection runs every face_stride frames; boxes are reused in between
+        self.face_stride = 2
+        self.frame_index = 0
+        self.cached_faces = None
         
         # Analysis modules (simplified mode - no MediaPipe)
         self.voice_analyzer = VoiceStress(sample_rate=16000, chunk_duration=1.0)
@@ -69,18 +127,17 @@ class LieDarGUI(QMainWindow):
         self.voice_stress = 0.0
         self.pulse_stress = 0.0
         self.bpm = 75.0
-        self.alert_level = "medium_stress"
+        self.alert_level = AlertLevel.MEDIUM_STRESS
         
         # Setup UI
         self.setup_ui()
         
-        # Start voice recording
+        # Start voice recording and frame capture
         self.voice_analyzer.start_recording()
         
-        # Setup timer for updates
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start(33)  # ~30 FPS
+        # Updates are driven by the camera: each fresh frame triggers update_frame
+        self.grabber.frame_ready.connect(self.update_frame)
+        self.grabber.start()
         
     def setup_ui(self):
         """Setup the user interface."""
@@ -106,8 +163,12 @@ class LieDarGUI(QMainWindow):
         self.video_label.setMinimumSize(640, 480)
         self.video_label.setStyleSheet("border: 2px solid #00ff00; background-color: #000000;")
         self.video_label.setAlignment(Qt.AlignCenter)
+        self.video_label.setScaledContents(False)
         content_layout.addWidget(self.video_label, stretch=2)
         
+        # Target size for the preview pixmap, refreshed in resizeEvent
+        self.video_size = (640, 480)
+        
         # Stats panel
         stats_panel = QFrame()
         stats_panel.setStyleSheet("background-color: #2d2d2d; border: 2px solid #444444; border-radius: 10px;")
@@ -188,17 +249,25 @@ class LieDarGUI(QMainWindow):
         info.setStyleSheet("color: #888888; font-size: 12px; margin: 10px;")
         main_layout.addWidget(info)
         
-    def update_frame(self):
+    def update_frame(self, frame: np.ndarray):
         """Update video frame and analysis."""
-        ret, frame = self.cap.read()
-        if not ret:
-            return
-        
-        frame = cv2.flip(frame, 1)
+        try:
+            self.process_frame(frame)
+        finally:
+            self.grabber.frame_done()
+    
+    def process_frame(self, frame: np.ndarray):
+        """Run analysis on a frame and refresh the display."""
+        # Mirror into a reused buffer
+        if self.mirror_buffer is None or self.mirror_buffer.shape != frame.shape:
+            self.mirror_buffer = np.empty_like(frame)
+        frame = cv2.flip(frame, 1, dst=self.mirror_buffer)
         
         # Simple face detection
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+        self.frame_index += 1
+        if self.frame_index % self.face_stride == 0 or self.cached_faces is None:
+            self.cached_faces = self.face_detector.detect(frame)
+        faces = self.cached_faces
         
         if len(faces) > 0:
             x, y, w, h = faces[0]
@@ -206,17 +275,15 @@ class LieDarGUI(QMainWindow):
             cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
             
             # Draw forehead region
-            forehead_y_start = y
-            forehead_y_end = y + int(h * 0.3)
-            forehead_x_start = x + int(w * 0.2)
-            forehead_x_end = x + int(w * 0.8)
+            (forehead_x_start, forehead_y_start,
+             forehead_x_end, forehead_y_end) = forehead_region(x, y, w, h)
             cv2.rectangle(frame, (forehead_x_start, forehead_y_start),
                         (forehead_x_end, forehead_y_end), (255, 0, 255), 2)
             cv2.putText(frame, "Alin Bolgesi", (forehead_x_start, forehead_y_start - 10),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 2)
         
-        # Voice analysis
-        self.voice_stress, voice_metrics = self.voice_analyzer.analyze_audio()
+        # Voice analysis (latest result from the analyzer's worker thread)
+        self.voice_stress, voice_metrics = self.voice_analyzer.get_latest()
         
         # Simple pulse (placeholder)
         self.pulse_stress = 10.0 if len(faces) > 0 else 0.0
@@ -230,13 +297,13 @@ class LieDarGUI(QMainWindow):
         # Update UI
         self.update_stats()
         
-        # Display frame
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        self.video_label.setPixmap(QPixmap.fromImage(qt_image).scaled(
-            self.video_label.width(), self.video_label.height(), Qt.KeepAspectRatio))
+        # Display frame (Qt reads BGR directly, no color conversion needed)
+        h, w = frame.shape[:2]
+        qt_image = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+        # Nearest-neighbour scaling is plenty for a preview and much cheaper
+        pixmap = QPixmap.fromImage(qt_image).scaled(
+            self.video_size[0], self.video_size[1], Qt.KeepAspectRatio, Qt.FastTransformation)
+        self.video_label.setPixmap(pixmap)
     
     def update_stats(self):
         """Update statistics display."""
@@ -260,9 +327,9 @@ class LieDarGUI(QMainWindow):
         
         # Alert level
         alert_text = {
-            "low_stress": ("DÜŞÜK", "#00ff00"),
-            "medium_stress": ("ORTA", "#ffff00"),
-            "high_stress": ("YÜKSEK", "#ff0000")
+            AlertLevel.LOW_STRESS: ("DÜŞÜK", "#00ff00"),
+            AlertLevel.MEDIUM_STRESS: ("ORTA", "#ffff00"),
+            AlertLevel.HIGH_STRESS: ("YÜKSEK", "#ff0000")
         }
         text, color = alert_text.get(self.alert_level, ("ORTA", "#ffff00"))
         self.alert_label.setText(text)
@@ -281,11 +348,20 @@ class LieDarGUI(QMainWindow):
         self.honesty_score = 50.0
         print("✓ Sistem sıfırlandı")
     
+    def resizeEvent(self, event):
+        """Cache the video label size once the layout has settled."""
+        super().resizeEvent(event)
+        self.video_size = (self.video_label.width(), self.video_label.height())
+    
     def closeEvent(self, event):
         """Cleanup on close."""
-        self.timer.stop()
+        stopped = self.grabber.stop()
         self.voice_analyzer.stop_recording()
-        self.cap.release()
+        # Releasing while the thread is still inside grab() is unsafe
+        if stopped:
+            self.cap.release()
+        else:
+            print("Camera thread did not stop in time; leaving capture open")
         event.accept()
 
 
@@ -11,12 +11,35 @@ Key Features:
 - Bandpass filtering (48-180 BPM range)
 """
 
+import bisect
 import cv2
+import functools
+import math
 import numpy as np
 from scipy import signal
-from scipy.fft import fft, fftfreq
+from scipy.fft import rfft
 from collections import deque
 from typing import Tuple, Optional
+from src.rolling import RollingWindow
+
+
+@functools.lru_cache(maxsize=8)
+def _design_butter(order: int, low: float, high: float) -> np.ndarray:
+    """
+    Design (and cache) Butterworth bandpass coefficients.
+    
+    The passband depends only on fps and the BPM range, which are fixed at
+    runtime, so the pole/zero design runs once instead of on every frame.
+    
+    Args:
+        order: Filter order
+        low: Normalized low cutoff (0-1, fraction of Nyquist)
+        high: Normalized high cutoff (0-1, fraction of Nyquist)
+        
+    Returns:
+        Second-order sections, shape (order, 6)
+    """
+    return signal.butter(order, [low, high], btype='band', output='sos')
 
 
 class BPM_Estimator:
@@ -38,8 +61,12 @@ class BPM_Estimator:
         self.fps = fps
         self.buffer_size = fps * buffer_seconds  # Number of frames to buffer
         
-        # Signal buffer (stores mean green channel values over time)
-        self.signal_buffer = deque(maxlen=self.buffer_size)
+        # Signal buffer (stores mean green channel values over time); float32
+        # is ample for 8-bit pixel means, and its running sum gives O(1) DC removal
+        self.signal_buffer = RollingWindow(self.buffer_size, dtype=np.float32)
+        
+        # Bandpass-filtered signal, filtered one sample at a time as it arrives
+        self.filtered_buffer = RollingWindow(self.buffer_size, dtype=np.float32)
         
         # Bandpass filter parameters
         # Physiological heart rate range: 48-180 BPM = 0.8-3.0 Hz
@@ -48,9 +75,33 @@ class BPM_Estimator:
         self.min_hz = self.min_bpm / 60.0
         self.max_hz = self.max_bpm / 60.0
         
+        # Streaming IIR filter: coefficients designed once, state carried across frames
+        self.filter_sos = self._design_filter()
+        self.filter_state = None
+        
+        # Heart rate changes slowly: re-run the FFT twice per second, not every frame
+        self.frame_count = 0
+        self.estimate_interval = max(1, self.fps // 2)
+        self.last_metrics = {}
+        
+        # Forehead landmark indices (top center of face, above eyebrows)
+        # These represent a horizontal band across the forehead
+        self.FOREHEAD_INDICES = np.array([10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
+                                          397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136],
+                                         dtype=np.intp)
+        
+        # The forehead barely moves between frames: reuse its bounding box
+        # until the nose tip moves or the refresh interval elapses
+        self.NOSE_TIP_INDEX = 1
+        self.roi_motion_threshold = 5.0  # Pixels of nose-tip motion
+        self.roi_refresh_interval = 15  # Frames
+        self.roi_bbox = None  # (x_min, y_min, x_max, y_max)
+        self.roi_anchor = None  # Nose tip position when roi_bbox was computed
+        
         # Current BPM estimate
         self.current_bpm = 0.0
         self.bpm_history = deque(maxlen=10)  # Smooth BPM over last 10 estimates
+        self.bpm_sorted = []  # Same values kept sorted, for an O(1) median
         
     def _extract_forehead_roi(self, frame: np.ndarray, 
                               landmarks) -> Optional[np.ndarray]:
@@ -61,10 +112,11 @@ class BPM_Estimator:
         - Use forehead landmarks from MediaPipe (landmarks 10, 338, 297, 332, 284, etc.)
         - Create bounding box around forehead area
         - Extract ROI with some padding
+        - Reuse the previous box while the nose tip stays within a few pixels
         
         Args:
             frame: Input BGR frame
-            landmarks: MediaPipe facial landmarks
+            landmarks: LandmarkCache (pixel coordinates, see src.landmarks)
             
         Returns:
             Forehead ROI as numpy array, or None if extraction fails
@@ -72,28 +124,26 @@ class BPM_Estimator:
         if landmarks is None:
             return None
         
-        img_height, img_width = frame.shape[:2]
-        
-        # Forehead landmark indices (top center of face, above eyebrows)
-        # These represent a horizontal band across the forehead
-        forehead_indices = [10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
-                           397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136]
-        
-        # Extract coordinates
-        forehead_points = []
-        for idx in forehead_indices:
-            lm = landmarks.landmark[idx]
-            x = int(lm.x * img_width)
-            y = int(lm.y * img_height)
-            forehead_points.append([x, y])
-        
-        forehead_points = np.array(forehead_points)
-        
-        # Calculate bounding box
-        x_min = max(0, np.min(forehead_points[:, 0]) - 10)
-        x_max = min(img_width, np.max(forehead_points[:, 0]) + 10)
-        y_min = max(0, np.min(forehead_points[:, 1]) - 10)
-        y_max = min(img_height, np.max(forehead_points[:, 1]) + 10)
+        anchor_x, anchor_y = landmarks.pts[self.NOSE_TIP_INDEX]
+        if (self.roi_bbox is None
+                or self.frame_count % self.roi_refresh_interval == 0
+                or math.hypot(anchor_x - self.roi_anchor[0],
+                              anchor_y - self.roi_anchor[1]) >= self.roi_motion_threshold):
+            img_height, img_width = frame.shape[:2]
+            
+            # Gather from the shared pixel-coordinate table in one fancy-index
+            forehead_points = landmarks.pts[self.FOREHEAD_INDICES]
+            
+            # Calculate bounding box
+            x_min = max(0, int(forehead_points[:, 0].min()) - 10)
+            x_max = min(img_width, int(forehead_points[:, 0].max()) + 10)
+            y_min = max(0, int(forehead_points[:, 1].min()) - 10)
+            y_max = min(img_height, int(forehead_points[:, 1].max()) + 10)
+            
+            self.roi_bbox = (x_min, y_min, x_max, y_max)
+            self.roi_anchor = (anchor_x, anchor_y)
+        else:
+            x_min, y_min, x_max, y_max = self.roi_bbox
         
         # Extract ROI
         roi = frame[y_min:y_max, x_min:x_max]
@@ -123,31 +173,20 @@ class BPM_Estimator:
         Returns:
             Mean green channel intensity
         """
-        # Extract green channel (index 1 in BGR)
-        green_channel = roi[:, :, 1]
-        
-        # Calculate spatial mean
-        mean_green = np.mean(green_channel)
+        # Spatial mean of the green channel (index 1 in BGR). cv2.mean is a
+        # compiled SIMD reduction that reads the ROI view in place, with
+        # integer accumulation and no float64 temporaries
+        mean_green = cv2.mean(roi)[1]
         
         return mean_green
     
-    def _apply_bandpass_filter(self, signal_data: np.ndarray) -> np.ndarray:
+    def _design_filter(self) -> Optional[np.ndarray]:
         """
-        Apply bandpass filter to isolate heart rate frequencies.
+        Design the Butterworth bandpass filter for the current fps.
         
-        Mathematical Approach:
-        - Use Butterworth bandpass filter
-        - Passband: 0.8-3.0 Hz (48-180 BPM)
-        - Remove low-frequency trends and high-frequency noise
-        - Order 3 for balance between sharpness and ringing
-        
-        Args:
-            signal_data: Raw PPG signal
-            
         Returns:
-            Filtered signal
+            Second-order sections, or None if the passband is invalid
         """
-        # Design Butterworth bandpass filter
         nyquist = self.fps / 2.0  # Nyquist frequency
         low = self.min_hz / nyquist
         high = self.max_hz / nyquist
@@ -157,15 +196,42 @@ class BPM_Estimator:
         high = max(0.001, min(high, 0.999))
         
         if low >= high:
-            return signal_data  # Return unfiltered if invalid range
+            return None
         
-        # Create filter coefficients
-        b, a = signal.butter(3, [low, high], btype='band')
+        return _design_butter(3, round(low, 6), round(high, 6))
+    
+    def _apply_bandpass_filter(self, value: float) -> float:
+        """
+        Apply bandpass filter to isolate heart rate frequencies.
         
-        # Apply filter
-        filtered_signal = signal.filtfilt(b, a, signal_data)
+        Mathematical Approach:
+        - Use Butterworth bandpass filter
+        - Passband: 0.8-3.0 Hz (48-180 BPM)
+        - Remove low-frequency trends and high-frequency noise
+        - Order 3 for balance between sharpness and ringing
+        - Cascaded second-order sections: numerically stable where the
+          equivalent (b, a) polynomial has poles crowded near z = 1
+        - Streaming (causal) IIR: the filter state is carried between
+          frames, so each new sample costs O(filter order) instead of
+          re-filtering the whole buffer. Phase shift does not affect the
+          FFT magnitude used for BPM.
         
-        return filtered_signal
+        Args:
+            value: New (DC-removed) PPG sample
+            
+        Returns:
+            Filtered sample
+        """
+        if self.filter_sos is None:
+            return value  # Return unfiltered if invalid range
+        
+        if self.filter_state is None:
+            # Start in steady state for the first sample to limit the transient
+            self.filter_state = signal.sosfilt_zi(self.filter_sos) * value
+        
+        filtered, self.filter_state = signal.sosfilt(self.filter_sos, [value], zi=self.filter_state)
+        
+        return float(filtered[0])
     
     def _estimate_bpm_fft(self, signal_data: np.ndarray) -> float:
         """
@@ -186,40 +252,64 @@ class BPM_Estimator:
         Returns:
             Estimated BPM
         """
-        # Compute FFT
+        # Compute FFT (real input: rfft returns only the non-negative half
+        # of the Hermitian-symmetric spectrum, at half the work)
         N = len(signal_data)
-        fft_vals = fft(signal_data)
-        fft_freq = fftfreq(N, 1.0 / self.fps)
-        
-        # Only consider positive frequencies
-        positive_mask = fft_freq > 0
-        fft_freq = fft_freq[positive_mask]
-        fft_power = np.abs(fft_vals[positive_mask]) ** 2
-        
-        # Filter to physiological range (0.8-3.0 Hz)
-        valid_range = (fft_freq >= self.min_hz) & (fft_freq <= self.max_hz)
-        valid_freq = fft_freq[valid_range]
-        valid_power = fft_power[valid_range]
-        
-        if len(valid_power) == 0:
+        fft_vals = rfft(signal_data)  # float32 input keeps pocketfft in single precision
+        
+        # Bin k sits at k * fps / N Hz, so the physiological range (0.8-3.0 Hz)
+        # is a fixed slice of bins: no frequency array, no boolean mask.
+        # The DC bin is always skipped.
+        k_lo = max(1, int(np.ceil(self.min_hz * N / self.fps)))
+        k_hi = min(len(fft_vals) - 1, int(np.floor(self.max_hz * N / self.fps)))
+        if k_hi < k_lo:
             return 0.0
         
+        # Power without the sqrt of np.abs
+        band = fft_vals[k_lo:k_hi + 1]
+        band_power = band.real * band.real + band.imag * band.imag
+        
         # Find frequency with maximum power
-        max_idx = np.argmax(valid_power)
-        dominant_freq = valid_freq[max_idx]
+        k = k_lo + int(np.argmax(band_power))
+        dominant_freq = k * self.fps / N
         
         # Convert to BPM
         bpm = dominant_freq * 60.0
         
         return bpm
     
+    def _update_median(self, bpm: float) -> float:
+        """
+        Add a BPM estimate to the history and return the history's median.
+        
+        The history is tiny (10 values), so a sorted list maintained by
+        bisect insertion/removal beats building an array for np.median.
+        
+        Args:
+            bpm: New raw BPM estimate
+            
+        Returns:
+            Median of the last bpm_history.maxlen estimates
+        """
+        if len(self.bpm_history) == self.bpm_history.maxlen:
+            oldest = self.bpm_history[0]
+            del self.bpm_sorted[bisect.bisect_left(self.bpm_sorted, oldest)]
+        self.bpm_history.append(bpm)
+        bisect.insort(self.bpm_sorted, bpm)
+        
+        n = len(self.bpm_sorted)
+        mid = n // 2
+        if n % 2:
+            return self.bpm_sorted[mid]
+        return (self.bpm_sorted[mid - 1] + self.bpm_sorted[mid]) / 2.0
+    
     def process_frame(self, frame: np.ndarray, landmarks) -> Tuple[float, dict]:
         """
         Process a single video frame to update BPM estimate.
         
         Args:
             frame: BGR video frame
-            landmarks: MediaPipe facial landmarks
+            landmarks: LandmarkCache (pixel coordinates, see src.landmarks)
             
         Returns:
             Tuple of (bpm, metrics_dict)
@@ -238,27 +328,28 @@ class BPM_Estimator:
         # Add to buffer
         self.signal_buffer.append(ppg_value)
         
+        # Remove DC component with the running mean, then bandpass filter
+        centered = ppg_value - self.signal_buffer.mean()
+        self.filtered_buffer.append(self._apply_bandpass_filter(centered))
+        self.frame_count += 1
+        
         # Need sufficient data for FFT (at least 5 seconds)
         min_buffer_size = self.fps * 5
-        if len(self.signal_buffer) < min_buffer_size:
-            progress = len(self.signal_buffer) / min_buffer_size * 100
+        if len(self.filtered_buffer) < min_buffer_size:
+            progress = len(self.filtered_buffer) / min_buffer_size * 100
             return 0.0, {"status": "buffering", "progress": progress}
         
-        # Convert buffer to numpy array
-        signal_data = np.array(self.signal_buffer)
-        
-        # Detrend signal (remove DC component and linear trends)
-        signal_data = signal.detrend(signal_data)
+        # Between estimates, report the last BPM
+        if self.last_metrics and self.frame_count % self.estimate_interval != 0:
+            return self.current_bpm, self.last_metrics
         
-        # Apply bandpass filter
-        filtered_signal = self._apply_bandpass_filter(signal_data)
-        
-        # Estimate BPM using FFT
-        bpm = self._estimate_bpm_fft(filtered_signal)
+        # Estimate BPM using FFT, straight on the float32 ring buffer: once
+        # it wraps the samples are circularly rotated, which leaves the DFT
+        # power spectrum unchanged
+        bpm = self._estimate_bpm_fft(self.filtered_buffer.values)
         
         # Smooth BPM estimate
-        self.bpm_history.append(bpm)
-        self.current_bpm = np.median(self.bpm_history)  # Use median for robustness
+        self.current_bpm = self._update_median(bpm)  # Use median for robustness
         
         # Calculate stress score based on BPM
         # Normal resting heart rate: 60-80 BPM
@@ -277,6 +368,7 @@ class BPM_Estimator:
             "buffer_size": len(self.signal_buffer),
             "signal_quality": "good" if 50 <= self.current_bpm <= 180 else "poor"
         }
+        self.last_metrics = metrics
         
         return self.current_bpm, metrics
     
@@ -304,5 +396,12 @@ class BPM_Estimator:
     def reset(self):
         """Reset all buffers and estimates."""
         self.signal_buffer.clear()
+        self.filtered_buffer.clear()
+        self.filter_state = None
+        self.frame_count = 0
+        self.last_metrics = {}
+        self.roi_bbox = None
+        self.roi_anchor = None
         self.bpm_history.clear()
+        self.bpm_sorted.clear()
         self.current_bpm = 0.0
@@ -12,10 +12,13 @@ Key Features:
 """
 
 import cv2
+import math
 import numpy as np
 import mediapipe as mp
-from collections import deque
-from typing import List, Tuple, Optional
+from typing import Tuple, Optional
+from src.face_detector import FaceDetector
+from src.landmarks import LandmarkCache
+from src.rolling import RollingWindow
 
 
 class FacialAnalysis:
@@ -26,13 +29,22 @@ class FacialAnalysis:
     based on eyebrow movements, lip variations, and blink frequency.
     """
     
-    def __init__(self, window_size: int = 30, sensitivity: float = 2.0):
+    def __init__(self, window_size: int = 30, sensitivity: float = 2.0,
+                 detection_width: int = 320, fps: float = 30.0,
+                 inference_stride: int = 2, face_detector: Optional[FaceDetector] = None):
         """
         Initialize the facial analysis system.
         
         Args:
             window_size: Number of frames for rolling baseline calculation (default: 30)
             sensitivity: Standard deviation multiplier for anomaly detection (default: 2.0)
+            detection_width: Width of the downscaled image fed to Face Mesh (default: 320)
+            fps: Rate at which analyze_frame is called, for blink rate (default: 30)
+            inference_stride: While a face is tracked, run Face Mesh on every
+                              n-th frame and reuse the result in between (default: 2)
+            face_detector: Optional Haar detector used as a cheap presence gate:
+                           while no face is tracked, Face Mesh only runs once it
+                           sees a face (checked every inference_stride frames)
         """
         # Initialize MediaPipe Face Mesh
         self.mp_face_mesh = mp.solutions.face_mesh
@@ -43,31 +55,51 @@ class FacialAnalysis:
             min_tracking_confidence=0.5
         )
         
+        # Face Mesh returns normalized landmarks, so inference can run on a
+        # downscaled copy while metrics still use full-resolution coordinates
+        self.detection_width = detection_width
+        self.small_buffer = None
+        self.rgb_buffer = None
+        self.annotated_buffer = None
+        
+        # Expressions change slower than the frame rate, so Face Mesh (the
+        # dominant per-frame cost) runs at fps / inference_stride while tracking
+        self.inference_stride = max(1, inference_stride)
+        self.last_result = None  # (stress_score, metrics, landmarks) of last hit
+        self.face_detector = face_detector
+        
         # Statistical parameters
+        self.fps = fps
         self.window_size = window_size
         self.sensitivity = sensitivity
         
         # Rolling windows for baseline calculation
-        self.eyebrow_distances = deque(maxlen=window_size)
-        self.lip_distances = deque(maxlen=window_size)
-        self.blink_history = deque(maxlen=60)  # Track blinks over 60 frames (~2 seconds at 30fps)
+        self.eyebrow_distances = RollingWindow(window_size)
+        self.lip_distances = RollingWindow(window_size)
+        self.blink_history = RollingWindow(60)  # Track blinks over 60 frames (~2 seconds at 30fps)
         
-        # Landmark indices for key facial regions
+        # Landmark indices for key facial regions, as index arrays so each
+        # region is one gather from the landmark table
         # Eyebrow landmarks (left and right)
-        self.LEFT_EYEBROW = [70, 63, 105, 66, 107]
-        self.RIGHT_EYEBROW = [336, 296, 334, 293, 300]
+        self.LEFT_EYEBROW = np.array([70, 63, 105, 66, 107], dtype=np.intp)
+        self.RIGHT_EYEBROW = np.array([336, 296, 334, 293, 300], dtype=np.intp)
         
         # Eye landmarks for blink detection
-        self.LEFT_EYE_UPPER = [159, 145]
-        self.LEFT_EYE_LOWER = [23, 145]
-        self.RIGHT_EYE_UPPER = [386, 374]
-        self.RIGHT_EYE_LOWER = [253, 374]
+        self.LEFT_EYE_UPPER = np.array([159, 145], dtype=np.intp)
+        self.LEFT_EYE_LOWER = np.array([23, 145], dtype=np.intp)
+        self.RIGHT_EYE_UPPER = np.array([386, 374], dtype=np.intp)
+        self.RIGHT_EYE_LOWER = np.array([253, 374], dtype=np.intp)
         
         # Lip landmarks
-        self.LIP_UPPER = [13]  # Center upper lip
-        self.LIP_LOWER = [14]  # Center lower lip
-        self.LIP_LEFT_CORNER = [61]
-        self.LIP_RIGHT_CORNER = [291]
+        self.LIP_UPPER = np.array([13], dtype=np.intp)  # Center upper lip
+        self.LIP_LOWER = np.array([14], dtype=np.intp)  # Center lower lip
+        self.LIP_LEFT_CORNER = np.array([61], dtype=np.intp)
+        self.LIP_RIGHT_CORNER = np.array([291], dtype=np.intp)
+        
+        # Tesselation edges as an (E, 2) index array, converted once so drawing
+        # is a single gather plus cv2.polylines instead of a Python loop per edge
+        self.TESSELATION = np.array(sorted(self.mp_face_mesh.FACEMESH_TESSELATION), dtype=np.intp)
+        self.TESSELATION_COLOR = (192, 192, 192)  # MediaPipe's default tesselation style
         
         # State tracking
         self.frame_count = 0
@@ -76,29 +108,10 @@ class FacialAnalysis:
         
     def _euclidean_distance(self, point1: np.ndarray, point2: np.ndarray) -> float:
         """Calculate Euclidean distance between two points."""
-        return np.linalg.norm(point1 - point2)
+        # Scalar hypot: no temporary array or generic norm dispatch for 2 coordinates
+        return math.hypot(point1[0] - point2[0], point1[1] - point2[1])
     
-    def _get_landmark_coords(self, landmarks, indices: List[int], 
-                            img_width: int, img_height: int) -> np.ndarray:
-        """
-        Extract coordinates for specified landmark indices.
-        
-        Args:
-            landmarks: MediaPipe landmark results
-            indices: List of landmark indices to extract
-            img_width: Image width for denormalization
-            img_height: Image height for denormalization
-            
-        Returns:
-            Array of (x, y) coordinates
-        """
-        coords = []
-        for idx in indices:
-            lm = landmarks.landmark[idx]
-            coords.append([lm.x * img_width, lm.y * img_height])
-        return np.array(coords)
-    
-    def _compute_eyebrow_distance(self, landmarks, img_width: int, img_height: int) -> float:
+    def _compute_eyebrow_distance(self, pts: np.ndarray) -> float:
         """
         Compute average vertical distance between eyebrows and eyes.
         
@@ -111,21 +124,21 @@ class FacialAnalysis:
         Returns:
             Average eyebrow-to-eye distance
         """
-        left_eyebrow = self._get_landmark_coords(landmarks, self.LEFT_EYEBROW, img_width, img_height)
-        right_eyebrow = self._get_landmark_coords(landmarks, self.RIGHT_EYEBROW, img_width, img_height)
+        left_eyebrow = pts[self.LEFT_EYEBROW]
+        right_eyebrow = pts[self.RIGHT_EYEBROW]
         
         # Mean eyebrow position
-        eyebrow_y = np.mean([left_eyebrow[:, 1].mean(), right_eyebrow[:, 1].mean()])
+        eyebrow_y = (left_eyebrow[:, 1].mean() + right_eyebrow[:, 1].mean()) / 2.0
         
         # Mean eye position (using upper eyelid landmarks)
-        left_eye = self._get_landmark_coords(landmarks, self.LEFT_EYE_UPPER, img_width, img_height)
-        right_eye = self._get_landmark_coords(landmarks, self.RIGHT_EYE_UPPER, img_width, img_height)
-        eye_y = np.mean([left_eye[:, 1].mean(), right_eye[:, 1].mean()])
+        left_eye = pts[self.LEFT_EYE_UPPER]
+        right_eye = pts[self.RIGHT_EYE_UPPER]
+        eye_y = (left_eye[:, 1].mean() + right_eye[:, 1].mean()) / 2.0
         
         # Vertical distance (smaller = eyebrows closer to eyes, often indicates tension)
         return eye_y - eyebrow_y
     
-    def _compute_lip_distance(self, landmarks, img_width: int, img_height: int) -> float:
+    def _compute_lip_distance(self, pts: np.ndarray) -> float:
         """
         Compute lip corner to center distance ratio.
         
@@ -137,10 +150,10 @@ class FacialAnalysis:
         Returns:
             Lip distance metric
         """
-        upper_lip = self._get_landmark_coords(landmarks, self.LIP_UPPER, img_width, img_height)
-        lower_lip = self._get_landmark_coords(landmarks, self.LIP_LOWER, img_width, img_height)
-        left_corner = self._get_landmark_coords(landmarks, self.LIP_LEFT_CORNER, img_width, img_height)
-        right_corner = self._get_landmark_coords(landmarks, self.LIP_RIGHT_CORNER, img_width, img_height)
+        upper_lip = pts[self.LIP_UPPER]
+        lower_lip = pts[self.LIP_LOWER]
+        left_corner = pts[self.LIP_LEFT_CORNER]
+        right_corner = pts[self.LIP_RIGHT_CORNER]
         
         # Vertical distance (lip opening)
         vertical_dist = self._euclidean_distance(upper_lip[0], lower_lip[0])
@@ -151,7 +164,7 @@ class FacialAnalysis:
         # Return ratio (normalized metric)
         return vertical_dist / (horizontal_dist + 1e-6)  # Add epsilon to avoid division by zero
     
-    def _detect_blink(self, landmarks, img_width: int, img_height: int) -> bool:
+    def _detect_blink(self, pts: np.ndarray) -> bool:
         """
         Detect eye blinks using eye aspect ratio (EAR).
         
@@ -168,13 +181,13 @@ class FacialAnalysis:
             True if blink detected in current frame
         """
         # Calculate left eye aspect ratio
-        left_upper = self._get_landmark_coords(landmarks, self.LEFT_EYE_UPPER, img_width, img_height)
-        left_lower = self._get_landmark_coords(landmarks, self.LEFT_EYE_LOWER, img_width, img_height)
+        left_upper = pts[self.LEFT_EYE_UPPER]
+        left_lower = pts[self.LEFT_EYE_LOWER]
         left_vertical = self._euclidean_distance(left_upper[0], left_lower[0])
         
         # Calculate right eye aspect ratio
-        right_upper = self._get_landmark_coords(landmarks, self.RIGHT_EYE_UPPER, img_width, img_height)
-        right_lower = self._get_landmark_coords(landmarks, self.RIGHT_EYE_LOWER, img_width, img_height)
+        right_upper = pts[self.RIGHT_EYE_UPPER]
+        right_lower = pts[self.RIGHT_EYE_LOWER]
         right_vertical = self._euclidean_distance(right_upper[0], right_lower[0])
         
         # Average vertical distance
@@ -187,7 +200,7 @@ class FacialAnalysis:
         return avg_vertical < blink_threshold
     
     def _compute_anomaly_score(self, current_value: float, 
-                               history: deque, metric_name: str) -> float:
+                               history: RollingWindow, metric_name: str) -> float:
         """
         Compute anomaly score using z-score normalization.
         
@@ -209,47 +222,86 @@ class FacialAnalysis:
         if len(history) < 5:  # Need minimum history for statistics
             return 0.0
         
-        baseline = np.mean(history)
-        std_dev = np.std(history) + 1e-6  # Add epsilon to avoid division by zero
+        baseline = history.mean()
+        std_dev = history.std() + 1e-6  # Add epsilon to avoid division by zero
         
         # Z-score calculation
         z_score = abs(current_value - baseline) / std_dev
         
         # Normalize to 0-100 scale
         # Values beyond 2σ indicate significant anomaly
-        anomaly_score = min(100.0, (z_score / self.sensitivity) * 100.0)
-        
-        return anomaly_score
+        return min(100.0, (z_score / self.sensitivity) * 100.0)
     
-    def analyze_frame(self, frame: np.ndarray) -> Tuple[float, dict, Optional[np.ndarray]]:
+    def analyze_frame(self, frame: np.ndarray,
+                      draw: bool = False) -> Tuple[float, dict, Optional[np.ndarray], Optional[object]]:
         """
         Analyze a single video frame for facial stress indicators.
         
         Args:
             frame: BGR image from video capture
+            draw: Also return an annotated copy of the frame (default: False)
             
         Returns:
-            Tuple of (stress_score, metrics_dict, annotated_frame)
+            Tuple of (stress_score, metrics_dict, annotated_frame, landmarks)
             - stress_score: Overall facial stress score (0-100)
             - metrics_dict: Detailed metrics for debugging
-            - annotated_frame: Frame with landmarks drawn (or None if no face detected)
+            - annotated_frame: Frame with landmarks drawn (None unless draw=True
+              and a face was detected)
+            - landmarks: LandmarkCache of the detected face (or None), so callers
+              can reuse this inference instead of running Face Mesh again
         """
         self.frame_count += 1
+        
+        # Between inference frames, reuse the last detection (redrawn on this frame)
+        if self.last_result is not None and self.frame_count % self.inference_stride:
+            stress_score, metrics, landmarks = self.last_result
+            annotated_frame = self.draw_landmarks(frame, landmarks) if draw else None
+            return stress_score, metrics, annotated_frame, landmarks
+        
+        # Not tracking: a downscaled Haar pass (~1 ms) decides whether the
+        # much more expensive Face Mesh inference is worth running
+        if self.last_result is None and self.face_detector is not None:
+            if self.frame_count % self.inference_stride or len(self.face_detector.detect(frame)) == 0:
+                return 0.0, {"error": "No face detected"}, None, None
+        
         img_height, img_width = frame.shape[:2]
         
-        # Convert to RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
+        # Downscale for inference (keeping aspect ratio)
+        small_width = min(self.detection_width, img_width)
+        small_height = int(round(img_height * small_width / img_width))
+        if small_width < img_width:
+            if self.small_buffer is None or self.small_buffer.shape[:2] != (small_height, small_width):
+                self.small_buffer = np.empty((small_height, small_width, 3), dtype=np.uint8)
+            cv2.resize(frame, (small_width, small_height), dst=self.small_buffer,
+                       interpolation=cv2.INTER_AREA)
+            inference_frame = self.small_buffer
+        else:
+            inference_frame = frame
+        
+        # Convert to RGB for MediaPipe (into a reused buffer)
+        if self.rgb_buffer is None or self.rgb_buffer.shape != inference_frame.shape:
+            self.rgb_buffer = np.empty_like(inference_frame)
+        self.rgb_buffer.flags.writeable = True
+        cv2.cvtColor(inference_frame, cv2.COLOR_BGR2RGB, dst=self.rgb_buffer)
+        
+        # MediaPipe wraps read-only arrays without copying them
+        self.rgb_buffer.flags.writeable = False
+        results = self.face_mesh.process(self.rgb_buffer)
         
         if not results.multi_face_landmarks:
-            return 0.0, {"error": "No face detected"}, None
+            self.last_result = None  # Lost the face: try again on the next frame
+            return 0.0, {"error": "No face detected"}, None, None
         
-        landmarks = results.multi_face_landmarks[0]
+        # Denormalize all landmarks once; every metric indexes this table
+        landmarks = LandmarkCache.from_mediapipe(
+            results.multi_face_landmarks[0], img_width, img_height
+        )
+        pts = landmarks.pts
         
         # Compute facial metrics
-        eyebrow_dist = self._compute_eyebrow_distance(landmarks, img_width, img_height)
-        lip_dist = self._compute_lip_distance(landmarks, img_width, img_height)
-        is_blinking = self._detect_blink(landmarks, img_width, img_height)
+        eyebrow_dist = self._compute_eyebrow_distance(pts)
+        lip_dist = self._compute_lip_distance(pts)
+        is_blinking = self._detect_blink(pts)
         
         # Update history
         self.eyebrow_distances.append(eyebrow_dist)
@@ -264,8 +316,8 @@ class FacialAnalysis:
         
         self.last_blink_state = is_blinking
         
-        # Calculate blink rate (blinks per minute)
-        blink_rate = (sum(self.blink_history) / len(self.blink_history)) * 60 * 30  # Assuming 30fps
+        # Calculate blink rate (blinks per minute); history advances once per inference
+        blink_rate = self.blink_history.mean() * 60 * self.fps / self.inference_stride
         
         # Compute anomaly scores for each metric
         eyebrow_anomaly = self._compute_anomaly_score(eyebrow_dist, self.eyebrow_distances, "eyebrow")
@@ -292,17 +344,43 @@ class FacialAnalysis:
             "stress_score": stress_score
         }
         
-        # Draw landmarks on frame
-        annotated_frame = frame.copy()
-        mp.solutions.drawing_utils.draw_landmarks(
-            image=annotated_frame,
-            landmark_list=landmarks,
-            connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-            landmark_drawing_spec=None,
-            connection_drawing_spec=mp.solutions.drawing_styles.get_default_face_mesh_tesselation_style()
-        )
+        self.last_result = (stress_score, metrics, landmarks)
+        
+        # Annotation is optional: inference-only callers skip the copy and the draw
+        annotated_frame = self.draw_landmarks(frame, landmarks) if draw else None
+        
+        return stress_score, metrics, annotated_frame, landmarks
+    
+    def draw_landmarks(self, frame: np.ndarray, landmarks: LandmarkCache,
+                       in_place: bool = False) -> np.ndarray:
+        """
+        Draw the face mesh tesselation onto the frame.
+        
+        Also used to overlay cached landmarks on frames where inference
+        was skipped. Unless in_place is set, drawing goes to a copy held in
+        a buffer reused across calls, so the result is only valid until the
+        next call.
         
-        return stress_score, metrics, annotated_frame
+        Args:
+            frame: BGR image to annotate
+            landmarks: Landmark table from analyze_frame
+            in_place: Draw directly onto frame instead of a copy (default: False)
+            
+        Returns:
+            Annotated frame
+        """
+        if in_place:
+            annotated_frame = frame
+        else:
+            if self.annotated_buffer is None or self.annotated_buffer.shape != frame.shape:
+                self.annotated_buffer = np.empty_like(frame)
+            annotated_frame = self.annotated_buffer
+            np.copyto(annotated_frame, frame)
+        
+        # One polylines call draws every edge as a 2-point open polyline
+        segments = landmarks.pts[self.TESSELATION].astype(np.int32)
+        cv2.polylines(annotated_frame, segments, False, self.TESSELATION_COLOR, 1)
+        return annotated_frame
     
     def reset(self):
         """Reset all history and counters."""
@@ -312,6 +390,7 @@ class FacialAnalysis:
         self.frame_count = 0
         self.blink_count = 0
         self.last_blink_state = False
+        self.last_result = None
     
     def __del__(self):
         """Cleanup MediaPipe resources."""
@@ -0,0 +1,24 @@
+"""
+JIT Helpers for Lie-Dar System
+===============================
+Optional Numba acceleration for small per-frame numeric kernels.
+
+numba is an optional dependency (see requirements.txt). When it is not
+installed, njit falls back to a no-op decorator and the kernels run as
+plain Python with identical results.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and called forms)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
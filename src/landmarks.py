@@ -0,0 +1,48 @@
+"""
+Landmark Table Module for Lie-Dar System
+=========================================
+Denormalized facial landmark coordinates shared between analysis modules.
+
+Key Features:
+- One pass over MediaPipe's protobuf landmarks per frame
+- (N, 2) float32 pixel-coordinate table indexed by every consumer
+"""
+
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass
+class LandmarkCache:
+    """
+    Pixel coordinates of one face's landmarks, computed once per inference.
+
+    Reading MediaPipe landmarks means one protobuf attribute access per
+    coordinate. Facial metrics and the rPPG ROI used to read overlapping
+    landmarks separately; building this table once lets every consumer
+    gather its points with a single numpy fancy-index.
+    """
+
+    pts: np.ndarray  # (468, 2) float32 pixel coordinates (x, y)
+    landmarks: object  # Original MediaPipe landmark list
+
+    @classmethod
+    def from_mediapipe(cls, landmarks, img_width: int, img_height: int) -> "LandmarkCache":
+        """
+        Build the table from MediaPipe Face Mesh landmarks.
+
+        Args:
+            landmarks: MediaPipe landmark list (results.multi_face_landmarks[i])
+            img_width: Image width for denormalization
+            img_height: Image height for denormalization
+
+        Returns:
+            LandmarkCache with pixel coordinates
+        """
+        lms = landmarks.landmark
+        pts = np.fromiter(
+            (c for lm in lms for c in (lm.x, lm.y)),
+            dtype=np.float32, count=2 * len(lms)
+        ).reshape(-1, 2)
+        pts *= (img_width, img_height)
+        return cls(pts=pts, landmarks=landmarks)
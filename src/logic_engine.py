@@ -11,8 +11,19 @@ Key Features:
 """
 
 import numpy as np
+from collections import deque
 from typing import Dict, Tuple
 from enum import Enum
+from src.jit import njit
+
+
+@njit("float64(float64, float64, float64, float64, float64, float64)", cache=True, fastmath=True)
+def _fuse(facial_weight, voice_weight, pulse_weight,
+          facial_stress, voice_stress, pulse_stress):
+    """Weighted sum of the three stress scores, each clamped to 0-100."""
+    return (facial_weight * min(100.0, max(0.0, facial_stress)) +
+            voice_weight * min(100.0, max(0.0, voice_stress)) +
+            pulse_weight * min(100.0, max(0.0, pulse_stress)))
 
 
 class AlertLevel(Enum):
@@ -22,6 +33,10 @@ class AlertLevel(Enum):
     LOW_STRESS = "low_stress"        # Score > 60 (likely honest)
 
 
+# Alert levels indexed by how many thresholds (40, 60) a score reaches
+_ALERT_LEVELS = (AlertLevel.HIGH_STRESS, AlertLevel.MEDIUM_STRESS, AlertLevel.LOW_STRESS)
+
+
 class LogicEngine:
     """
     Multi-modal fusion engine for lie detection.
@@ -56,9 +71,50 @@ class LogicEngine:
         self.voice_weight = voice_weight
         self.pulse_weight = pulse_weight
         
-        # Score history for smoothing
-        self.honesty_history = []
+        # Weight vector (facial, voice, pulse) for array-valued fusion
+        self.weights = np.array([facial_weight, voice_weight, pulse_weight])
+        
+        # Score history for smoothing, with a running sum for an O(1) mean
         self.max_history = 10
+        self.honesty_history = deque(maxlen=self.max_history)
+        self.honesty_sum = 0.0
+        
+        # Interpretation text per alert level: (headline, explanation)
+        self.INTERPRETATIONS = {
+            AlertLevel.HIGH_STRESS: (
+                "HIGH STRESS DETECTED",
+                "Multiple deception indicators present. Subject may be withholding truth."),
+            AlertLevel.MEDIUM_STRESS: (
+                "MODERATE STRESS",
+                "Mixed signals detected. Possible nervousness or mild deception."),
+            AlertLevel.LOW_STRESS: (
+                "LOW STRESS",
+                "Minimal deception indicators. Subject appears truthful."),
+        }
+        self.last_interpretation = None  # ((alert_level, rounded score), text)
+        
+        # analyze() runs every frame: its result dicts are built once and
+        # updated in place instead of being reallocated per call
+        self.component_scores = {
+            "facial_contribution": 0.0,
+            "voice_contribution": 0.0,
+            "pulse_contribution": 0.0,
+            "facial_raw": 0.0,
+            "voice_raw": 0.0,
+            "pulse_raw": 0.0
+        }
+        self.weight_info = {
+            "facial": self.facial_weight,
+            "voice": self.voice_weight,
+            "pulse": self.pulse_weight
+        }
+        self.result = {
+            "honesty_score": 0.0,
+            "alert_level": AlertLevel.MEDIUM_STRESS,
+            "component_scores": self.component_scores,
+            "interpretation": "",
+            "weights": self.weight_info
+        }
         
     def calculate_honesty_score(self,
                                 facial_stress: float,
@@ -88,31 +144,61 @@ class LogicEngine:
         Returns:
             Honesty score (0-100)
         """
-        # Validate inputs
-        facial_stress = np.clip(facial_stress, 0, 100)
-        voice_stress = np.clip(voice_stress, 0, 100)
-        pulse_stress = np.clip(pulse_stress, 0, 100)
-        
-        # Calculate weighted combined stress
-        combined_stress = (
-            self.facial_weight * facial_stress +
-            self.voice_weight * voice_stress +
-            self.pulse_weight * pulse_stress
-        )
+        # Clamp inputs and calculate weighted combined stress in one
+        # straight-line scalar kernel (native code when numba is installed)
+        combined_stress = _fuse(self.facial_weight, self.voice_weight, self.pulse_weight,
+                                float(facial_stress), float(voice_stress), float(pulse_stress))
         
         # Convert stress to honesty (inverse relationship)
         honesty_score = 100.0 - combined_stress
         
-        # Add to history for smoothing
+        # Add to history for smoothing (the deque evicts the oldest score)
+        if len(self.honesty_history) == self.max_history:
+            self.honesty_sum -= self.honesty_history[0]
         self.honesty_history.append(honesty_score)
-        if len(self.honesty_history) > self.max_history:
-            self.honesty_history.pop(0)
+        self.honesty_sum += honesty_score
         
         # Return smoothed score (moving average)
-        smoothed_score = np.mean(self.honesty_history)
+        smoothed_score = self.honesty_sum / len(self.honesty_history)
         
         return smoothed_score
     
+    def analyze_batch(self,
+                      facial_stress: np.ndarray,
+                      voice_stress: np.ndarray,
+                      pulse_stress: np.ndarray) -> np.ndarray:
+        """
+        Score a whole recording at once (offline evaluation).
+        
+        Applies the same clamping, weighting and moving-average smoothing as
+        calling calculate_honesty_score once per frame from a fresh history,
+        but as vectorized array operations. The live score history is not
+        touched.
+        
+        Args:
+            facial_stress: Facial stress score per frame (0-100)
+            voice_stress: Voice stress score per frame (0-100)
+            pulse_stress: Pulse stress score per frame (0-100)
+            
+        Returns:
+            Smoothed honesty score per frame (0-100)
+        """
+        # Weighted fusion: one (N, 3) @ (3,) product over clamped scores. The
+        # stacked copy is the only (N, 3) allocation; clamping and the
+        # inversion run in place instead of creating temporaries
+        stresses = np.column_stack((facial_stress, voice_stress, pulse_stress)).astype(np.float64, copy=False)
+        np.clip(stresses, 0.0, 100.0, out=stresses)
+        honesty = stresses @ self.weights
+        np.subtract(100.0, honesty, out=honesty)
+        
+        # Moving average over max_history frames via cumulative sums
+        cumulative = np.cumsum(honesty)
+        window_sums = cumulative.copy()
+        window_sums[self.max_history:] -= cumulative[:-self.max_history]
+        window_lengths = np.minimum(np.arange(1, len(honesty) + 1), self.max_history)
+        
+        return window_sums / window_lengths
+    
     def get_alert_level(self, honesty_score: float) -> AlertLevel:
         """
         Classify alert level based on honesty score.
@@ -128,12 +214,8 @@ class LogicEngine:
         Returns:
             AlertLevel enum
         """
-        if honesty_score < 40:
-            return AlertLevel.HIGH_STRESS
-        elif honesty_score < 60:
-            return AlertLevel.MEDIUM_STRESS
-        else:
-            return AlertLevel.LOW_STRESS
+        # int() so numpy scalars (np.bool_ comparisons) index like Python floats
+        return _ALERT_LEVELS[int(honesty_score >= 40) + int(honesty_score >= 60)]
     
     def analyze(self,
                facial_stress: float,
@@ -150,9 +232,10 @@ class LogicEngine:
         Returns:
             Dictionary containing:
             - honesty_score: Overall honesty assessment (0-100)
-            - alert_level: Classification (HIGH/MEDIUM/LOW_STRESS)
+            - alert_level: AlertLevel classification (HIGH/MEDIUM/LOW_STRESS)
             - component_scores: Individual modality contributions
             - interpretation: Human-readable description
+            The same dictionary is updated by every call; copy it to keep it.
         """
         # Calculate honesty score
         honesty_score = self.calculate_honesty_score(
@@ -163,29 +246,22 @@ class LogicEngine:
         alert_level = self.get_alert_level(honesty_score)
         
         # Calculate component contributions (weighted scores)
-        component_scores = {
-            "facial_contribution": facial_stress * self.facial_weight,
-            "voice_contribution": voice_stress * self.voice_weight,
-            "pulse_contribution": pulse_stress * self.pulse_weight,
-            "facial_raw": facial_stress,
-            "voice_raw": voice_stress,
-            "pulse_raw": pulse_stress
-        }
+        component_scores = self.component_scores
+        component_scores["facial_contribution"] = facial_stress * self.facial_weight
+        component_scores["voice_contribution"] = voice_stress * self.voice_weight
+        component_scores["pulse_contribution"] = pulse_stress * self.pulse_weight
+        component_scores["facial_raw"] = facial_stress
+        component_scores["voice_raw"] = voice_stress
+        component_scores["pulse_raw"] = pulse_stress
         
         # Generate interpretation
         interpretation = self._generate_interpretation(honesty_score, alert_level)
         
-        return {
-            "honesty_score": honesty_score,
-            "alert_level": alert_level.value,
-            "component_scores": component_scores,
-            "interpretation": interpretation,
-            "weights": {
-                "facial": self.facial_weight,
-                "voice": self.voice_weight,
-                "pulse": self.pulse_weight
-            }
-        }
+        result = self.result
+        result["honesty_score"] = honesty_score
+        result["alert_level"] = alert_level
+        result["interpretation"] = interpretation
+        return result
     
     def _generate_interpretation(self, honesty_score: float, 
                                 alert_level: AlertLevel) -> str:
@@ -199,19 +275,20 @@ class LogicEngine:
         Returns:
             Interpretation string
         """
-        if alert_level == AlertLevel.HIGH_STRESS:
-            return (f"HIGH STRESS DETECTED (Score: {honesty_score:.1f}/100). "
-                   "Multiple deception indicators present. Subject may be withholding truth.")
-        elif alert_level == AlertLevel.MEDIUM_STRESS:
-            return (f"MODERATE STRESS (Score: {honesty_score:.1f}/100). "
-                   "Mixed signals detected. Possible nervousness or mild deception.")
-        else:
-            return (f"LOW STRESS (Score: {honesty_score:.1f}/100). "
-                   "Minimal deception indicators. Subject appears truthful.")
+        # The text only changes when the displayed (one-decimal) score or the level does
+        key = (alert_level, round(honesty_score, 1))
+        if self.last_interpretation is not None and self.last_interpretation[0] == key:
+            return self.last_interpretation[1]
+        
+        prefix, suffix = self.INTERPRETATIONS[alert_level]
+        interpretation = f"{prefix} (Score: {key[1]:.1f}/100). {suffix}"
+        self.last_interpretation = (key, interpretation)
+        return interpretation
     
     def reset(self):
         """Reset score history."""
         self.honesty_history.clear()
+        self.honesty_sum = 0.0
     
     def update_weights(self, facial: float = None, 
                       voice: float = None, 
@@ -224,15 +301,21 @@ class LogicEngine:
             voice: New voice weight (optional)
             pulse: New pulse weight (optional)
         """
-        if facial is not None:
-            self.facial_weight = facial
-        if voice is not None:
-            self.voice_weight = voice
-        if pulse is not None:
-            self.pulse_weight = pulse
-        
-        # Normalize to sum to 1.0
-        total = self.facial_weight + self.voice_weight + self.pulse_weight
-        self.facial_weight /= total
-        self.voice_weight /= total
-        self.pulse_weight /= total
+        facial = self.facial_weight if facial is None else facial
+        voice = self.voice_weight if voice is None else voice
+        pulse = self.pulse_weight if pulse is None else pulse
+        
+        # Normalize to sum to 1.0 (skipped when already normalized, e.g.
+        # a UI re-sending unchanged weights every frame)
+        total = facial + voice + pulse
+        if abs(total - 1.0) > 1e-9:
+            facial, voice, pulse = facial / total, voice / total, pulse / total
+        
+        self.facial_weight = facial
+        self.voice_weight = voice
+        self.pulse_weight = pulse
+        
+        self.weights = np.array([facial, voice, pulse])
+        self.weight_info["facial"] = facial
+        self.weight_info["voice"] = voice
+        self.weight_info["pulse"] = pulse
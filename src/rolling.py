@@ -0,0 +1,83 @@
+"""
+Rolling Window Module for Lie-Dar System
+=========================================
+Fixed-size numeric ring buffer for per-frame rolling statistics.
+
+Key Features:
+- Preallocated contiguous storage (no per-frame allocation)
+- O(1) append with automatic eviction of the oldest sample
+- O(1) running sum, mean and variance
+"""
+
+import numpy as np
+
+
+class RollingWindow:
+    """
+    Fixed-capacity ring buffer of numbers.
+
+    Replaces collections.deque for numeric histories: values live in one
+    contiguous numpy array, and running sum / sum of squares are updated
+    on every append so mean and variance cost O(1) regardless of size.
+    """
+
+    def __init__(self, size: int, dtype=np.float32):
+        """
+        Initialize the rolling window.
+
+        Args:
+            size: Maximum number of samples kept
+            dtype: Storage dtype (default: float32)
+        """
+        self.size = size
+        self.buffer = np.zeros(size, dtype=dtype)
+        self.index = 0  # Next write position
+        self.count = 0  # Number of valid samples
+        self.sum = 0.0  # Running sums kept in double precision
+        self.sum_sq = 0.0
+
+    def append(self, value: float):
+        """Add a sample, evicting the oldest one when full."""
+        old = float(self.buffer[self.index])
+        self.buffer[self.index] = value
+        value = float(self.buffer[self.index])  # Rounded to storage dtype
+        if self.count == self.size:
+            self.sum += value - old
+            self.sum_sq += value * value - old * old
+        else:
+            self.sum += value
+            self.sum_sq += value * value
+            self.count += 1
+        self.index = (self.index + 1) % self.size
+        
+        # Resynchronize once per lap so rounding error cannot accumulate
+        if self.index == 0:
+            values = self.buffer.astype(np.float64)
+            self.sum = float(values.sum())
+            self.sum_sq = float(values @ values)
+
+    def mean(self) -> float:
+        """Mean of the valid samples (0.0 when empty)."""
+        return self.sum / self.count if self.count else 0.0
+
+    def std(self) -> float:
+        """Population standard deviation of the valid samples."""
+        if not self.count:
+            return 0.0
+        mean = self.sum / self.count
+        return max(self.sum_sq / self.count - mean * mean, 0.0) ** 0.5
+
+    @property
+    def values(self) -> np.ndarray:
+        """Valid samples (storage order, not chronological)."""
+        return self.buffer[:self.count]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        """Remove all samples."""
+        self.index = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_sq = 0.0
@@ -14,6 +14,7 @@ Key Features:
 import cv2
 import numpy as np
 from typing import Dict, Optional
+from src.logic_engine import AlertLevel
 
 
 class Visualizer:
@@ -49,9 +50,56 @@ class Visualizer:
         self.bar_height = 40
         self.margin = 20
         
+        # Alert display per level: (text, color)
+        self.ALERT_DISPLAY = {
+            level: (level.value.upper().replace("_", " "), color)
+            for level, color in ((AlertLevel.HIGH_STRESS, self.COLOR_RED),
+                                 (AlertLevel.MEDIUM_STRESS, self.COLOR_YELLOW),
+                                 (AlertLevel.LOW_STRESS, self.COLOR_GREEN))
+        }
+        
+        # Component stress bars: (label, component_scores key, BGR color)
+        self.COMPONENT_BARS = [
+            ("Facial", "facial_raw", (255, 100, 0)),  # Blue-ish
+            ("Voice", "voice_raw", (0, 165, 255)),    # Orange
+            ("Pulse", "pulse_raw", (147, 20, 255)),   # Pink
+        ]
+        self.component_bar_height = 25
+        
+        # Score colors precomputed for each integer score 0-100
+        self.color_lut = [self._interpolate_score_color(score) for score in range(101)]
+        
+        # Static UI chrome per frame size: (template canvas, text overlays)
+        self.template_cache = {}
+        
+        # Bar label strings by (label, displayed value, max value); values are
+        # shown to one decimal, so each label has a bounded set of strings
+        self.label_cache = {}
+        
+        # Last rendered canvas and the displayed values it shows
+        self.last_canvas = None
+        self.last_state = None
+        
+        # Panel text whose glyphs reach up into the video rows (the honesty
+        # label): (y_start, mask, pixels), reapplied over each new video frame
+        self.panel_spill = None
+        
     def _get_color_for_score(self, score: float) -> tuple:
         """
-        Get color based on honesty score.
+        Get color based on honesty score (lookup in the precomputed table).
+        
+        Args:
+            score: Honesty score (0-100)
+            
+        Returns:
+            BGR color tuple
+        """
+        index = 0 if score < 0 else 100 if score > 100 else int(score)
+        return self.color_lut[index]
+    
+    def _interpolate_score_color(self, score: float) -> tuple:
+        """
+        Compute color for an honesty score.
         
         Color gradient:
         - 0-40: Red (high stress)
@@ -92,7 +140,7 @@ class Visualizer:
         Draw a horizontal bar chart.
         
         Args:
-            img: Image to draw on
+            img: Image to draw on (uint8 BGR ndarray)
             x, y: Top-left corner position
             width, height: Bar dimensions
             value: Current value
@@ -104,16 +152,35 @@ class Visualizer:
         cv2.rectangle(img, (x, y), (x + width, y + height), 
                      self.COLOR_GRAY, 2)
         
-        # Draw filled portion
-        fill_width = int((value / max_value) * width)
-        cv2.rectangle(img, (x, y), (x + fill_width, y + height), 
-                     color, -1)
+        # Draw filled portion: a direct slice write covering the same pixels
+        # as a filled cv2.rectangle, without OpenCV argument marshalling
+        fill_width = min(width, max(0, int((value / max_value) * width)))
+        img[y:y + height + 1, x:x + fill_width + 1] = color
         
         # Draw label and value
-        label_text = f"{label}: {value:.1f}/{max_value:.0f}"
+        label_text = self._format_label(label, value, max_value)
         cv2.putText(img, label_text, (x, y - 10),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.COLOR_WHITE, 2)
     
+    def _format_label(self, label: str, value: float, max_value: float) -> str:
+        """
+        Format a bar label, reusing the string built for the same displayed value.
+        
+        Args:
+            label: Text label
+            value: Current value (shown to one decimal)
+            max_value: Maximum value
+            
+        Returns:
+            Label text, e.g. "Voice: 42.0/100"
+        """
+        key = (label, round(value, 1), max_value)
+        text = self.label_cache.get(key)
+        if text is None:
+            text = f"{label}: {key[1]:.1f}/{max_value:.0f}"
+            self.label_cache[key] = text
+        return text
+    
     def _draw_metric(self, img: np.ndarray, x: int, y: int,
                     label: str, value: str, color: tuple):
         """
@@ -130,12 +197,70 @@ class Visualizer:
         cv2.putText(img, text, (x, y),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
     
+    def _build_template(self, frame_height: int, frame_width: int) -> tuple:
+        """
+        Render the static UI chrome for a frame size once.
+        
+        The panel background and component bar borders never change, and the
+        header/instruction text is always drawn at the same place over the
+        video. Rasterizing them once and copying pixels each frame replaces
+        the per-frame cv2.rectangle/cv2.putText calls.
+        
+        Args:
+            frame_height, frame_width: Video frame dimensions
+            
+        Returns:
+            Tuple of (template, overlays, component_bars):
+            - template: Canvas with panel background, bar borders and static text
+            - overlays: (y_start, y_end, mask) strips of the video area whose
+              masked pixels are text to copy over each new video frame
+            - component_bars: (x, y, width, height) of each component bar
+        """
+        canvas_height = frame_height + self.info_panel_height
+        template = np.zeros((canvas_height, frame_width, 3), dtype=np.uint8)
+        
+        # Info panel background (dark gray)
+        cv2.rectangle(template, 
+                     (0, frame_height), 
+                     (frame_width, canvas_height),
+                     (40, 40, 40), -1)
+        
+        # Component bar borders (below the main honesty bar)
+        component_bar_width = (frame_width - 4 * self.margin) // 3
+        bars_y = frame_height + self.margin + self.bar_height + 30
+        component_bars = []
+        for i in range(len(self.COMPONENT_BARS)):
+            x = self.margin * (i + 1) + component_bar_width * i
+            cv2.rectangle(template, (x, bars_y),
+                         (x + component_bar_width, bars_y + self.component_bar_height),
+                         self.COLOR_GRAY, 2)
+            component_bars.append((x, bars_y, component_bar_width, self.component_bar_height))
+        
+        # Header and instruction text (drawn over the video area)
+        overlays = []
+        static_text = [
+            ("LIE-DAR: Real-Time Deception Detection System", 30, 0.8, 2),
+            ("Press 'Q' to quit | 'R' to reset", frame_height - 20, 0.5, 1),
+        ]
+        for text, baseline_y, scale, thickness in static_text:
+            cv2.putText(template, text, (self.margin, baseline_y),
+                       cv2.FONT_HERSHEY_SIMPLEX, scale, self.COLOR_WHITE, thickness)
+            
+            (_, text_height), baseline = cv2.getTextSize(
+                text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+            y_start = max(0, baseline_y - text_height - thickness)
+            y_end = min(frame_height, baseline_y + baseline + thickness)
+            mask = template[y_start:y_end].any(axis=2, keepdims=True)
+            overlays.append((y_start, y_end, mask))
+        
+        return template, overlays, component_bars
+    
     def render_frame(self,
                     video_frame: np.ndarray,
                     honesty_score: float,
                     component_scores: Dict,
                     bpm: float,
-                    alert_level: str,
+                    alert_level: AlertLevel,
                     facial_metrics: Optional[Dict] = None,
                     voice_metrics: Optional[Dict] = None) -> np.ndarray:
         """
@@ -146,35 +271,78 @@ class Visualizer:
             honesty_score: Overall honesty score (0-100)
             component_scores: Individual modality scores
             bpm: Current heart rate
-            alert_level: Alert status string
+            alert_level: Alert status
             facial_metrics: Optional facial analysis metrics
             voice_metrics: Optional voice analysis metrics
             
         Returns:
-            Combined visualization frame
+            Combined visualization frame (a persistent buffer overwritten by
+            the next call; copy it to keep it)
         """
         frame_height, frame_width = video_frame.shape[:2]
         
-        # Create extended canvas for info panel
-        canvas_height = frame_height + self.info_panel_height
-        canvas = np.zeros((canvas_height, frame_width, 3), dtype=np.uint8)
+        # Static chrome, rendered once per frame size
+        key = (frame_height, frame_width)
+        if key not in self.template_cache:
+            self.template_cache[key] = self._build_template(frame_height, frame_width)
+        template, overlays, component_bars = self.template_cache[key]
         
-        # Place video frame on top
-        canvas[0:frame_height, 0:frame_width] = video_frame
+        # Everything the info panel draws: label strings, bar fill widths and
+        # colors, so any visible change (including a color threshold) redraws
+        bar_width = frame_width - 2 * self.margin
+        honesty_color = self._get_color_for_score(honesty_score)
+        component_fills = []
+        for (label, score_key, _), (_, _, width, _) in zip(self.COMPONENT_BARS, component_bars):
+            value = component_scores.get(score_key, 0)
+            component_fills.append((self._format_label(label, value, 100.0),
+                                    min(width, max(0, int((value / 100.0) * width)))))
+        bpm_text = f"{bpm:.0f}"
+        bpm_color = self.COLOR_GREEN if 60 <= bpm <= 90 else self.COLOR_YELLOW
+        blink_text = f"{facial_metrics.get('blink_rate', 0):.1f}/min" if facial_metrics else None
+        jitter = voice_metrics.get("jitter", 0) if voice_metrics else 0
+        jitter_text = f"{jitter:.2f}%" if jitter > 0 else None
+        state = (
+            self._format_label("HONESTY SCORE", honesty_score, 100.0),
+            min(bar_width, max(0, int((honesty_score / 100.0) * bar_width))),
+            honesty_color,
+            tuple(component_fills),
+            bpm_text, bpm_color, alert_level,
+            blink_text, jitter_text
+        )
         
-        # Info panel background (dark gray)
-        cv2.rectangle(canvas, 
-                     (0, frame_height), 
-                     (frame_width, canvas_height),
-                     (40, 40, 40), -1)
+        # Scores update slower than the video: when nothing shown in the panel
+        # changed, only the video area of the last canvas is refreshed
+        canvas = self.last_canvas
+        if canvas is None or canvas.shape != template.shape:
+            # One persistent canvas per stream size, reused every frame
+            canvas = np.empty_like(template)
+            self.last_state = None
+        panel_dirty = state != self.last_state
+        
+        # Video on top, with the header and instruction text over it
+        canvas[0:frame_height] = video_frame
+        for y_start, y_end, mask in overlays:
+            np.copyto(canvas[y_start:y_end], template[y_start:y_end], where=mask)
+        
+        if not panel_dirty:
+            # Restore the panel text that overlaps the bottom video rows
+            spill_start, spill_mask, spill_pixels = self.panel_spill
+            np.copyto(canvas[spill_start:frame_height], spill_pixels, where=spill_mask)
+            return canvas
+        self.last_canvas = canvas
+        self.last_state = state
+        
+        # Video rows the panel text may draw into, before the panel is drawn
+        spill_start = max(0, frame_height - self.margin)
+        spill_before = canvas[spill_start:frame_height].copy()
+        
+        # Cached info panel below
+        canvas[frame_height:] = template[frame_height:]
         
         # Calculate positions for UI elements
         panel_y = frame_height + self.margin
         
         # 1. Main Honesty Score Bar
-        bar_width = frame_width - 2 * self.margin
-        honesty_color = self._get_color_for_score(honesty_score)
-        
         self._draw_bar(
             canvas,
             self.margin,
@@ -189,98 +357,46 @@ class Visualizer:
         
         panel_y += self.bar_height + 30
         
-        # 2. Individual Component Scores
-        component_bar_width = (frame_width - 4 * self.margin) // 3
-        component_bar_height = 25
-        
-        # Facial stress
-        facial_stress = component_scores.get("facial_raw", 0)
-        self._draw_bar(
-            canvas,
-            self.margin,
-            panel_y,
-            component_bar_width,
-            component_bar_height,
-            facial_stress,
-            100.0,
-            "Facial",
-            (255, 100, 0)  # Blue-ish
-        )
-        
-        # Voice stress
-        voice_stress = component_scores.get("voice_raw", 0)
-        self._draw_bar(
-            canvas,
-            self.margin * 2 + component_bar_width,
-            panel_y,
-            component_bar_width,
-            component_bar_height,
-            voice_stress,
-            100.0,
-            "Voice",
-            (0, 165, 255)  # Orange
-        )
+        # 2. Individual Component Scores: borders come from the template, so
+        # each bar is one slice fill (same pixels as a filled cv2.rectangle)
+        for (_, _, color), (x, y, _, height), (label_text, fill_width) in zip(
+                self.COMPONENT_BARS, component_bars, component_fills):
+            canvas[y:y + height + 1, x:x + fill_width + 1] = color
+            cv2.putText(canvas, label_text, (x, y - 10),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.COLOR_WHITE, 2)
         
-        # Pulse stress
-        pulse_stress = component_scores.get("pulse_raw", 0)
-        self._draw_bar(
-            canvas,
-            self.margin * 3 + component_bar_width * 2,
-            panel_y,
-            component_bar_width,
-            component_bar_height,
-            pulse_stress,
-            100.0,
-            "Pulse",
-            (147, 20, 255)  # Pink
-        )
-        
-        panel_y += component_bar_height + 30
+        panel_y += self.component_bar_height + 30
         
         # 3. BPM and Alert Status
         col1_x = self.margin
         col2_x = frame_width // 2
         
         # BPM indicator
-        bpm_color = self.COLOR_GREEN if 60 <= bpm <= 90 else self.COLOR_YELLOW
         self._draw_metric(canvas, col1_x, panel_y, 
-                         "BPM", f"{bpm:.0f}", bpm_color)
+                         "BPM", bpm_text, bpm_color)
         
         # Alert level
-        alert_color = {
-            "high_stress": self.COLOR_RED,
-            "medium_stress": self.COLOR_YELLOW,
-            "low_stress": self.COLOR_GREEN
-        }.get(alert_level, self.COLOR_WHITE)
-        
+        alert_text, alert_color = self.ALERT_DISPLAY[alert_level]
         self._draw_metric(canvas, col2_x, panel_y,
-                         "Alert", alert_level.upper().replace("_", " "),
-                         alert_color)
+                         "Alert", alert_text, alert_color)
         
         panel_y += 40
         
         # 4. Additional Metrics (if available)
-        if facial_metrics:
-            blink_rate = facial_metrics.get("blink_rate", 0)
+        if blink_text is not None:
             self._draw_metric(canvas, col1_x, panel_y,
-                            "Blink Rate", f"{blink_rate:.1f}/min",
+                            "Blink Rate", blink_text,
                             self.COLOR_WHITE)
         
-        if voice_metrics and voice_metrics.get("jitter", 0) > 0:
-            jitter = voice_metrics.get("jitter", 0)
+        if jitter_text is not None:
             self._draw_metric(canvas, col2_x, panel_y,
-                            "Voice Jitter", f"{jitter:.2f}%",
+                            "Voice Jitter", jitter_text,
                             self.COLOR_WHITE)
         
-        # Add header text
-        header_text = "LIE-DAR: Real-Time Deception Detection System"
-        cv2.putText(canvas, header_text, (self.margin, 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.COLOR_WHITE, 2)
-        
-        # Add instruction text
-        instruction = "Press 'Q' to quit | 'R' to reset"
-        cv2.putText(canvas, instruction, (self.margin, frame_height - 20),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.COLOR_WHITE, 1)
+        # Remember which of those video pixels the panel drew over
+        spill_pixels = canvas[spill_start:frame_height].copy()
+        spill_mask = (spill_pixels != spill_before).any(axis=2, keepdims=True)
+        self.panel_spill = (spill_start, spill_mask, spill_pixels)
         
         return canvas
     
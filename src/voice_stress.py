@@ -11,6 +11,7 @@ Key Features:
 - RMS energy analysis
 """
 
+import math
 import numpy as np
 import pyaudio
 import librosa
@@ -18,6 +19,82 @@ from collections import deque
 from typing import Tuple, Optional
 import threading
 import time
+from src.jit import njit
+
+
+@njit(cache=True, fastmath=True)
+def _perturbation(x):
+    """
+    One-pass cycle-to-cycle perturbation statistics.
+    
+    Returns:
+        Tuple of (mean |x_i - x_(i-1)|, mean x) for len(x) >= 2
+    """
+    n = x.size
+    total = float(x[0])
+    diff_total = 0.0
+    for i in range(1, n):
+        total += x[i]
+        diff_total += abs(x[i] - x[i - 1])
+    return diff_total / (n - 1), total / n
+
+
+# No fastmath here: its 'nnan' flag lets LLVM fold the isnan() check
+# that skips unvoiced (NaN) frames
+@njit(cache=True)
+def _jitter_from_f0(f0):
+    """
+    Jitter percentage from an F0 track in one pass (capped at 100).
+    
+    NaN (unvoiced) frames are skipped and each F0 is converted to its
+    period on the fly, so no masked or period arrays are built.
+    """
+    n = 0
+    total = 0.0
+    diff_total = 0.0
+    prev = 0.0
+    for i in range(f0.size):
+        if math.isnan(f0[i]):
+            continue
+        period = 1.0 / (f0[i] + 1e-6)  # Epsilon avoids division by zero
+        if n > 0:
+            diff_total += abs(period - prev)
+        total += period
+        prev = period
+        n += 1
+    if n < 2:
+        return 0.0
+    jitter = (diff_total / (n - 1)) / (total / n) * 100.0
+    return min(jitter, 100.0)
+
+
+@njit(cache=True, fastmath=True)
+def _shimmer_from_rms(rms):
+    """Shimmer percentage from per-frame RMS amplitudes (capped at 100)."""
+    if rms.size < 2:
+        return 0.0
+    mean_diff, mean_amplitude = _perturbation(rms)
+    if mean_amplitude < 1e-6:
+        return 0.0
+    shimmer = (mean_diff / mean_amplitude) * 100.0
+    return min(shimmer, 100.0)
+
+
+@njit(cache=True, fastmath=True)
+def _mean_std(x):
+    """
+    One-pass (Welford) mean and population standard deviation.
+    
+    Returns:
+        Tuple of (mean, std) for len(x) >= 1
+    """
+    mean = 0.0
+    m2 = 0.0
+    for i in range(x.size):
+        delta = x[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (x[i] - mean)
+    return mean, (m2 / x.size) ** 0.5
 
 
 class VoiceStress:
@@ -31,32 +108,62 @@ class VoiceStress:
     - Changed energy levels
     """
     
-    def __init__(self, sample_rate: int = 16000, chunk_duration: float = 1.0):
+    def __init__(self, sample_rate: int = 16000, chunk_duration: float = 1.0,
+                 fast_mode: bool = False, frames_per_buffer: int = 128):
         """
         Initialize the voice stress analyzer.
         
         Args:
             sample_rate: Audio sampling rate in Hz (default: 16000)
             chunk_duration: Duration of audio chunks to analyze in seconds (default: 1.0)
+            fast_mode: Track pitch with plain YIN and an energy voicing gate
+                       instead of pYIN (several times cheaper, default: False)
+            frames_per_buffer: Samples per capture callback (default: 128, 8 ms at 16 kHz)
         """
         self.sample_rate = sample_rate
         self.chunk_duration = chunk_duration
         self.chunk_size = int(sample_rate * chunk_duration)
         
-        # PyAudio configuration
+        # Pitch search range for pYIN
+        self.fmin = float(librosa.note_to_hz('C2'))  # ~65 Hz (low male voice)
+        self.fmax = float(librosa.note_to_hz('C7'))  # ~2093 Hz (high female voice)
+        
+        # Voice F0 (below C7) sits far under 4 kHz, so pitch is tracked on an
+        # 8 kHz copy; frame and hop lengths are scaled so frames keep the same
+        # timing (1024 / 256 at 8 kHz for 16 kHz input)
+        self.pitch_sample_rate = min(8000, sample_rate)
+        self.pitch_frame_length = 2048 * self.pitch_sample_rate // sample_rate
+        self.pitch_hop_length = self.pitch_frame_length // 4
+        
+        # Fast mode: YIN has no voicing model, so frames whose RMS (of the
+        # chunk scaled to unit peak) is below this threshold are treated as unvoiced
+        self.fast_mode = fast_mode
+        self.voicing_rms_threshold = 0.02
+        
+        # Chunks whose raw RMS is below this are silence: analysis is skipped
+        self.vad_rms_threshold = 0.005
+        
+        # PyAudio configuration; small capture blocks keep the ring buffer
+        # fresh (the callback only copies into it, so the higher rate is cheap)
+        self.frames_per_buffer = frames_per_buffer
         self.audio = pyaudio.PyAudio()
         self.stream = None
         
-        # Audio buffer
-        self.audio_buffer = deque(maxlen=sample_rate * 5)  # 5 seconds of audio
+        # Audio ring buffer (5 seconds): the capture callback writes blocks into
+        # it and analysis copies out the latest chunk, with no per-sample objects
+        self.audio_buffer = np.zeros(sample_rate * 5, dtype=np.float32)
+        self.buffer_index = 0  # Next write position
+        self.buffer_filled = 0  # Number of valid samples
+        self.buffer_lock = threading.Lock()  # Callback and analysis run on different threads
         
         # Feature history for baseline calculation
         self.pitch_history = deque(maxlen=30)
         self.jitter_history = deque(maxlen=30)
         self.shimmer_history = deque(maxlen=30)
         self.energy_history = deque(maxlen=30)
+        self.stress_components = np.zeros(3, dtype=np.float32)  # Pitch, jitter, shimmer
         
-        # Current measurements
+        # Current measurements (one dict, updated in place by every analysis)
         self.current_metrics = {
             "pitch_mean": 0.0,
             "pitch_std": 0.0,
@@ -70,6 +177,14 @@ class VoiceStress:
         self.is_recording = False
         self.record_thread = None
         
+        # Analysis runs on its own worker thread, woken by the capture
+        # callback, so pitch tracking never delays the realtime audio thread
+        # or the caller; get_latest() returns the newest result
+        self.data_ready = threading.Event()
+        self.analysis_thread = None
+        self.result_lock = threading.Lock()
+        self.latest_result = (0.0, {})
+        
     def start_recording(self):
         """Start asynchronous audio recording from microphone."""
         if self.is_recording:
@@ -82,13 +197,16 @@ class VoiceStress:
                 channels=1,
                 rate=self.sample_rate,
                 input=True,
-                frames_per_buffer=1024,
+                frames_per_buffer=self.frames_per_buffer,
                 stream_callback=self._audio_callback
             )
             
             self.is_recording = True
             self.stream.start_stream()
             
+            self.analysis_thread = threading.Thread(target=self._analysis_loop, daemon=True)
+            self.analysis_thread.start()
+            
         except Exception as e:
             print(f"Error starting audio recording: {e}")
             self.is_recording = False
@@ -98,44 +216,153 @@ class VoiceStress:
         if in_data:
             # Convert bytes to numpy array
             audio_data = np.frombuffer(in_data, dtype=np.float32)
-            self.audio_buffer.extend(audio_data)
+            self._write_audio(audio_data)
+            self.data_ready.set()  # Wake the analysis worker (never blocks)
         
         return (None, pyaudio.paContinue)
     
+    def _write_audio(self, samples: np.ndarray):
+        """Append samples to the ring buffer (two slice copies at most)."""
+        size = len(self.audio_buffer)
+        if len(samples) > size:
+            samples = samples[-size:]
+        n = len(samples)
+        
+        with self.buffer_lock:
+            start = self.buffer_index
+            first = min(n, size - start)
+            self.audio_buffer[start:start + first] = samples[:first]
+            self.audio_buffer[:n - first] = samples[first:]
+            self.buffer_index = (start + n) % size
+            self.buffer_filled = min(self.buffer_filled + n, size)
+    
+    def _latest_audio(self, n: int) -> np.ndarray:
+        """Copy the most recent n samples out of the ring buffer, oldest first (float32)."""
+        with self.buffer_lock:
+            end = self.buffer_index
+            start = end - n
+            if start >= 0:
+                return self.audio_buffer[start:end].copy()
+            return np.concatenate((self.audio_buffer[start:], self.audio_buffer[:end]))
+    
+    def _analysis_loop(self):
+        """Worker thread: analyze the newest audio whenever new data arrives."""
+        # Pay pYIN's one-time setup cost while the first audio chunk buffers
+        try:
+            self.warm_up()
+        except Exception as e:
+            print(f"Error in voice analysis: {e}")
+        
+        while self.is_recording:
+            if not self.data_ready.wait(timeout=0.1):
+                continue
+            self.data_ready.clear()
+            try:
+                stress_score, metrics = self.analyze_audio()
+                # Publish a snapshot: current_metrics keeps changing in place
+                with self.result_lock:
+                    self.latest_result = (stress_score, dict(metrics))
+            except Exception as e:
+                print(f"Error in voice analysis: {e}")
+    
+    def get_latest(self) -> Tuple[float, dict]:
+        """
+        Get the newest result from the analysis worker.
+        
+        Returns:
+            Tuple of (stress_score, metrics_dict); the dict is a snapshot of
+            analyze_audio's metrics that the worker does not modify later
+        """
+        with self.result_lock:
+            return self.latest_result
+    
     def stop_recording(self):
-        """Stop audio recording."""
+        """Stop audio recording and the analysis worker."""
+        self.is_recording = False
+        self.data_ready.set()
+        if (self.analysis_thread is not None and self.analysis_thread.is_alive()
+                and self.analysis_thread is not threading.current_thread()):
+            self.analysis_thread.join(timeout=2.0)
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
-        self.is_recording = False
+            self.stream = None
     
-    def _extract_pitch(self, audio_chunk: np.ndarray) -> Tuple[float, float]:
+    def warm_up(self):
         """
-        Extract pitch (fundamental frequency F0) statistics.
+        Run pitch tracking once on silence.
+        
+        The first librosa.pyin call pays one-time costs (numba JIT
+        compilation, cached transition matrices). Calling this from the
+        analysis thread right after start_recording overlaps those costs
+        with the initial buffering period instead of stalling the first
+        real analysis.
+        """
+        self._track_pitch(np.zeros(self.chunk_size, dtype=np.float32))
+    
+    def _track_pitch(self, audio_chunk: np.ndarray, peak: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Track the fundamental frequency (F0) over an audio chunk.
         
         Mathematical Approach:
         - Use librosa's pyin algorithm (probabilistic YIN)
         - YIN is autocorrelation-based pitch detection
-        - Calculate mean and std deviation of pitch over chunk
+        - Run once per chunk; pitch statistics and jitter share the result
+        - Runs on a polyphase-downsampled 8 kHz copy (half the samples)
+        - fast_mode: plain YIN (no Viterbi decoding) with an RMS voicing gate
+        
+        Args:
+            audio_chunk: Audio signal array
+            peak: Peak amplitude of the chunk (scales the fast_mode voicing gate)
+            
+        Returns:
+            Tuple of (f0, voiced_flag) per frame (f0 is NaN where unvoiced)
+        """
+        pitch_chunk = audio_chunk
+        if self.pitch_sample_rate != self.sample_rate:
+            pitch_chunk = librosa.resample(audio_chunk, orig_sr=self.sample_rate,
+                                           target_sr=self.pitch_sample_rate,
+                                           res_type='polyphase')
+        
+        if self.fast_mode:
+            # The scaled yin frames span the same time as rms's default
+            # 2048-sample frames on the original chunk, so they line up one-to-one
+            f0 = librosa.yin(pitch_chunk, fmin=self.fmin, fmax=self.fmax,
+                             sr=self.pitch_sample_rate, frame_length=self.pitch_frame_length,
+                             hop_length=self.pitch_hop_length)
+            rms = librosa.feature.rms(y=audio_chunk)[0]
+            voiced_flag = rms[:len(f0)] > self.voicing_rms_threshold * peak
+            f0[~voiced_flag] = np.nan  # Same convention as pyin
+            return f0, voiced_flag
+        
+        f0, voiced_flag, _ = librosa.pyin(
+            pitch_chunk,
+            fmin=self.fmin,
+            fmax=self.fmax,
+            sr=self.pitch_sample_rate,
+            frame_length=self.pitch_frame_length,
+            hop_length=self.pitch_hop_length
+        )
+        return f0, voiced_flag
+    
+    def _extract_pitch(self, f0: np.ndarray, voiced_flag: np.ndarray) -> Tuple[float, float]:
+        """
+        Extract pitch (fundamental frequency F0) statistics.
+        
+        Mathematical Approach:
+        - Calculate mean and std deviation of voiced pitch over chunk
         
         Stress Indicators:
         - Increased pitch variation (higher std)
         - Elevated baseline pitch (higher mean)
         
         Args:
-            audio_chunk: Audio signal array
+            f0: Per-frame F0 from _track_pitch
+            voiced_flag: Per-frame voicing decision from _track_pitch
             
         Returns:
             Tuple of (pitch_mean, pitch_std) in Hz
         """
-        # Extract pitch using probabilistic YIN algorithm
-        f0, voiced_flag, voiced_probs = librosa.pyin(
-            audio_chunk,
-            fmin=librosa.note_to_hz('C2'),  # ~65 Hz (low male voice)
-            fmax=librosa.note_to_hz('C7'),  # ~2093 Hz (high female voice)
-            sr=self.sample_rate
-        )
-        
         # Filter out unvoiced frames
         voiced_f0 = f0[voiced_flag]
         
@@ -148,12 +375,12 @@ class VoiceStress:
         if len(voiced_f0) == 0:
             return 0.0, 0.0
         
-        pitch_mean = np.mean(voiced_f0)
-        pitch_std = np.std(voiced_f0)
+        # Mean and std in a single pass
+        pitch_mean, pitch_std = _mean_std(voiced_f0)
         
         return pitch_mean, pitch_std
     
-    def _calculate_jitter(self, audio_chunk: np.ndarray) -> float:
+    def _calculate_jitter(self, f0: np.ndarray) -> float:
         """
         Calculate jitter (pitch period perturbation).
         
@@ -171,40 +398,13 @@ class VoiceStress:
         Stressed voice: >2%
         
         Args:
-            audio_chunk: Audio signal array
+            f0: Per-frame F0 from _track_pitch
             
         Returns:
             Jitter percentage (0-100)
         """
-        # Extract pitch periods using autocorrelation
-        try:
-            f0, _, _ = librosa.pyin(
-                audio_chunk,
-                fmin=librosa.note_to_hz('C2'),
-                fmax=librosa.note_to_hz('C7'),
-                sr=self.sample_rate
-            )
-            
-            # Remove NaN values
-            f0 = f0[~np.isnan(f0)]
-            
-            if len(f0) < 2:
-                return 0.0
-            
-            # Convert frequency to period (T = 1/f)
-            periods = 1.0 / (f0 + 1e-6)  # Add epsilon to avoid division by zero
-            
-            # Calculate absolute differences between consecutive periods
-            period_diffs = np.abs(np.diff(periods))
-            
-            # Calculate jitter
-            mean_period = np.mean(periods)
-            jitter = (np.mean(period_diffs) / mean_period) * 100.0
-            
-            return min(jitter, 100.0)  # Cap at 100%
-            
-        except Exception:
-            return 0.0
+        # Periods (T = 1/f) of the voiced frames, perturbation and cap in one kernel
+        return float(_jitter_from_f0(f0))
     
     def _calculate_shimmer(self, audio_chunk: np.ndarray) -> float:
         """
@@ -233,26 +433,17 @@ class VoiceStress:
         frame_length = 512
         hop_length = 256
         
-        rms = librosa.feature.rms(
-            y=audio_chunk,
-            frame_length=frame_length,
-            hop_length=hop_length
-        )[0]
-        
-        if len(rms) < 2:
+        if len(audio_chunk) < frame_length + hop_length:
             return 0.0
         
-        # Calculate absolute differences between consecutive amplitudes
-        amplitude_diffs = np.abs(np.diff(rms))
-        
-        # Calculate shimmer
-        mean_amplitude = np.mean(rms)
-        if mean_amplitude < 1e-6:
-            return 0.0
+        # Strided frame views (no copy) and a fused sum of squares per frame.
+        # Unlike librosa.feature.rms, frames are not zero-padded at the edges,
+        # so the chunk boundaries do not show up as artificial amplitude steps
+        frames = np.lib.stride_tricks.sliding_window_view(audio_chunk, frame_length)[::hop_length]
+        rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_length)
         
-        shimmer = (np.mean(amplitude_diffs) / mean_amplitude) * 100.0
-        
-        return min(shimmer, 100.0)  # Cap at 100%
+        # Consecutive amplitude differences, ratio and cap in one kernel
+        return float(_shimmer_from_rms(rms))
     
     def _calculate_energy(self, audio_chunk: np.ndarray) -> float:
         """
@@ -269,7 +460,8 @@ class VoiceStress:
         Returns:
             RMS energy
         """
-        rms_energy = np.sqrt(np.mean(audio_chunk ** 2))
+        # Sum of squares as one BLAS dot product: no squared temporary
+        rms_energy = float(np.sqrt(np.dot(audio_chunk, audio_chunk) / audio_chunk.size))
         return rms_energy
     
     def analyze_audio(self) -> Tuple[float, dict]:
@@ -281,22 +473,29 @@ class VoiceStress:
             - stress_score: Overall voice stress score (0-100)
             - metrics_dict: Detailed acoustic features
         """
-        if len(self.audio_buffer) < self.chunk_size:
-            progress = len(self.audio_buffer) / self.chunk_size * 100
+        if self.buffer_filled < self.chunk_size:
+            progress = self.buffer_filled / self.chunk_size * 100
             return 0.0, {"status": "buffering", "progress": progress}
         
-        # Get recent audio chunk
-        audio_chunk = np.array(list(self.audio_buffer)[-self.chunk_size:])
+        # Get recent audio chunk (a private contiguous float32 copy)
+        audio_chunk = self._latest_audio(self.chunk_size)
+        
+        # Voice activity gate: skip pitch tracking on silence
+        raw_energy = self._calculate_energy(audio_chunk)
+        if raw_energy <= self.vad_rms_threshold:
+            return self.current_metrics["stress_score"], {"status": "silent", "energy": raw_energy}
         
-        # Normalize audio
-        if np.max(np.abs(audio_chunk)) > 0:
-            audio_chunk = audio_chunk / np.max(np.abs(audio_chunk))
+        # No peak normalization: pitch tracking normalizes internally and
+        # jitter/shimmer are ratios. The peak only rescales the reported
+        # energy and the voicing gate (max/min avoid an abs() temporary)
+        peak = max(float(audio_chunk.max()), -float(audio_chunk.min()))
         
-        # Extract features
-        pitch_mean, pitch_std = self._extract_pitch(audio_chunk)
-        jitter = self._calculate_jitter(audio_chunk)
+        # Extract features (a single pYIN pass feeds both pitch features)
+        f0, voiced_flag = self._track_pitch(audio_chunk, peak)
+        pitch_mean, pitch_std = self._extract_pitch(f0, voiced_flag)
+        jitter = self._calculate_jitter(f0)
         shimmer = self._calculate_shimmer(audio_chunk)
-        energy = self._calculate_energy(audio_chunk)
+        energy = raw_energy / peak  # RMS of the peak-normalized chunk
         
         # Update history
         if pitch_mean > 0:  # Only add valid measurements
@@ -305,41 +504,37 @@ class VoiceStress:
             self.shimmer_history.append(shimmer)
             self.energy_history.append(energy)
         
-        # Calculate stress indicators
-        stress_components = []
+        # Calculate stress indicators (raw, capped together below)
+        comps = self.stress_components
+        first = 1  # Pitch slot is only used once a baseline exists
         
         # 1. Pitch variation stress (higher std indicates stress)
         if len(self.pitch_history) > 5:
             baseline_pitch_std = np.median(self.pitch_history)
             if baseline_pitch_std > 0:
-                pitch_stress = min(100.0, (pitch_std / baseline_pitch_std) * 50)
-                stress_components.append(pitch_stress)
+                comps[0] = (pitch_std / baseline_pitch_std) * 50
+                first = 0
         
         # 2. Jitter stress (>2% indicates stress)
-        jitter_stress = min(100.0, (jitter / 2.0) * 100)
-        stress_components.append(jitter_stress)
+        comps[1] = (jitter / 2.0) * 100
         
         # 3. Shimmer stress (>5% indicates stress)
-        shimmer_stress = min(100.0, (shimmer / 5.0) * 100)
-        stress_components.append(shimmer_stress)
-        
-        # Overall stress score (weighted average)
-        if len(stress_components) > 0:
-            stress_score = np.mean(stress_components)
-        else:
-            stress_score = 0.0
-        
-        # Update current metrics
-        self.current_metrics = {
-            "pitch_mean": pitch_mean,
-            "pitch_std": pitch_std,
-            "jitter": jitter,
-            "shimmer": shimmer,
-            "energy": energy,
-            "stress_score": stress_score
-        }
-        
-        return stress_score, self.current_metrics
+        comps[2] = (shimmer / 5.0) * 100
+        
+        # Overall stress score (average of capped components)
+        stress_score = float(np.clip(comps[first:], 0.0, 100.0).mean())
+        
+        # Update current metrics (under result_lock, which reset() also holds)
+        metrics = self.current_metrics
+        with self.result_lock:
+            metrics["pitch_mean"] = pitch_mean
+            metrics["pitch_std"] = pitch_std
+            metrics["jitter"] = jitter
+            metrics["shimmer"] = shimmer
+            metrics["energy"] = energy
+            metrics["stress_score"] = stress_score
+        
+        return stress_score, metrics
     
     def get_stress_score(self) -> float:
         """Get current voice stress score."""
@@ -347,19 +542,17 @@ class VoiceStress:
     
     def reset(self):
         """Reset all buffers and history."""
-        self.audio_buffer.clear()
+        with self.result_lock:
+            self.latest_result = (0.0, {})
+            for key in self.current_metrics:
+                self.current_metrics[key] = 0.0
+        with self.buffer_lock:
+            self.buffer_index = 0
+            self.buffer_filled = 0
         self.pitch_history.clear()
         self.jitter_history.clear()
         self.shimmer_history.clear()
         self.energy_history.clear()
-        self.current_metrics = {
-            "pitch_mean": 0.0,
-            "pitch_std": 0.0,
-            "jitter": 0.0,
-            "shimmer": 0.0,
-            "energy": 0.0,
-            "stress_score": 0.0
-        }
     
     def __del__(self):
         """Cleanup audio resources."""
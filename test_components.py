@@ -3,56 +3,58 @@ Simple Test Script for Lie-Dar Components
 ==========================================
 Tests individual modules without requiring full system setup.
 Useful for verifying installation and component functionality.
+
+Usage:
+    python test_components.py             # Quick: package presence + logic checks
+    python test_components.py --full      # Also import every library and Lie-Dar module
+    python test_components.py --hardware  # --full plus MediaPipe and camera tests
 """
 
 import sys
-import numpy as np
+import importlib
+import importlib.util
 
-def test_imports():
-    """Test that all required libraries can be imported."""
-    print("Testing imports...")
-    
-    try:
-        import cv2
-        print("✓ OpenCV imported successfully")
-    except ImportError as e:
-        print(f"✗ OpenCV import failed: {e}")
-        return False
-    
-    try:
-        import mediapipe
-        print("✓ MediaPipe imported successfully")
-    except ImportError as e:
-        print(f"✗ MediaPipe import failed: {e}")
-        return False
-    
-    try:
-        import numpy
-        print("✓ NumPy imported successfully")
-    except ImportError as e:
-        print(f"✗ NumPy import failed: {e}")
-        return False
-    
-    try:
-        import scipy
-        print("✓ SciPy imported successfully")
-    except ImportError as e:
-        print(f"✗ SciPy import failed: {e}")
-        return False
+# Camera and MediaPipe checks open real devices / load graphs; opt in with --hardware
+HARDWARE = "--hardware" in sys.argv
+
+# Real imports catch broken installs (e.g. PyAudio without PortAudio) but pay
+# every library's start-up cost; the quick default only checks presence
+FULL = "--full" in sys.argv or HARDWARE
+
+# (module name, display name) pairs probed by test_imports
+REQUIRED_PACKAGES = [
+    ("cv2", "OpenCV"),
+    ("mediapipe", "MediaPipe"),
+    ("numpy", "NumPy"),
+    ("scipy", "SciPy"),
+    ("librosa", "librosa"),
+    ("pyaudio", "PyAudio"),
+]
+
+def test_imports(full: bool = False):
+    """
+    Test that all required libraries are installed.
     
-    try:
-        import librosa
-        print("✓ librosa imported successfully")
-    except ImportError as e:
-        print(f"✗ librosa import failed: {e}")
-        return False
+    Args:
+        full: Actually import each library instead of only locating it
+    """
+    print("Testing imports...")
     
-    try:
-        import pyaudio
-        print("✓ PyAudio imported successfully")
-    except ImportError as e:
-        print(f"✗ PyAudio import failed: {e}")
-        print("  Note: PyAudio installation can be tricky. See README for platform-specific instructions.")
+    for module, name in REQUIRED_PACKAGES:
+        if full:
+            try:
+                importlib.import_module(module)
+                print(f"✓ {name} imported successfully")
+                continue
+            except Exception as e:  # Broken installs can fail with non-ImportErrors
+                print(f"✗ {name} import failed: {e}")
+        elif importlib.util.find_spec(module) is not None:
+            print(f"✓ {name} found")
+            continue
+        else:
+            print(f"✗ {name} not found")
+        if module == "pyaudio":
+            print("  Note: PyAudio installation can be tricky. See README for platform-specific instructions.")
         return False
     
     return True
@@ -118,7 +120,7 @@ def test_logic_engine():
         )
         
         print(f"  Honesty Score: {result['honesty_score']:.1f}/100")
-        print(f"  Alert Level: {result['alert_level']}")
+        print(f"  Alert Level: {result['alert_level'].value}")
         print(f"  Components: Facial={result['component_scores']['facial_raw']:.1f}, "
               f"Voice={result['component_scores']['voice_raw']:.1f}, "
               f"Pulse={result['component_scores']['pulse_raw']:.1f}")
@@ -129,16 +131,105 @@ def test_logic_engine():
         
         if abs(result['honesty_score'] - expected_honesty) < 0.1:
             print("✓ Logic engine calculations correct")
-            return True
         else:
             print(f"✗ Logic engine calculation error. Expected {expected_honesty}, got {result['honesty_score']}")
             return False
+        
+        # Batch scoring must match per-frame scoring from a fresh history.
+        # The sequence is longer than the smoothing window and includes
+        # out-of-range scores to exercise clamping
+        import numpy as np
+        rng = np.random.default_rng(0)
+        n_frames = engine.max_history * 2 + 7
+        facial, voice, pulse = rng.uniform(-20.0, 120.0, size=(3, n_frames))
+        
+        batch = engine.analyze_batch(facial, voice, pulse)
+        stream_engine = LogicEngine(facial_weight=0.4, voice_weight=0.3, pulse_weight=0.3)
+        stream = np.array([stream_engine.calculate_honesty_score(f, v, p)
+                           for f, v, p in zip(facial, voice, pulse)])
+        
+        max_error = float(np.max(np.abs(batch - stream)))
+        if max_error < 1e-6:
+            print(f"✓ Batch scoring matches per-frame scoring ({n_frames} frames)")
+            return True
+        else:
+            print(f"✗ Batch scoring differs from per-frame scoring (max error {max_error:.3g})")
+            return False
             
     except Exception as e:
         print(f"✗ Logic engine test failed: {e}")
         return False
 
 
+def test_alert_levels():
+    """Test alert level thresholds with Python and numpy scores."""
+    print("\nTesting alert levels...")
+    
+    try:
+        import numpy as np
+        from src.logic_engine import LogicEngine, AlertLevel
+        
+        engine = LogicEngine()
+        cases = [
+            (20.0, AlertLevel.HIGH_STRESS),
+            (39.9, AlertLevel.HIGH_STRESS),
+            (40.0, AlertLevel.MEDIUM_STRESS),
+            (50.0, AlertLevel.MEDIUM_STRESS),
+            (60.0, AlertLevel.LOW_STRESS),
+            (70.0, AlertLevel.LOW_STRESS),
+        ]
+        
+        for score, expected in cases:
+            for value in (score, np.float64(score)):
+                level = engine.get_alert_level(value)
+                if level is not expected:
+                    print(f"✗ Alert level for {value!r}: expected {expected.value}, got {level}")
+                    return False
+        
+        print("✓ Alert levels correct for float and np.float64 scores")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Alert level test failed: {e}")
+        return False
+
+
+def test_visualizer_cache():
+    """Test that frames with an unchanged panel match a full redraw."""
+    print("\nTesting visualizer panel cache...")
+    
+    try:
+        import numpy as np
+        from src.logic_engine import AlertLevel
+        from src.visualizer import Visualizer
+        
+        cached = Visualizer()
+        reference = Visualizer()
+        rng = np.random.default_rng(0)
+        scores = {"facial_raw": 30.0, "voice_raw": 25.0, "pulse_raw": 20.0}
+        
+        n_frames = 30
+        for i in range(n_frames):
+            video = rng.integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+            args = (video, 55.0, scores, 72.0, AlertLevel.MEDIUM_STRESS,
+                    {"blink_rate": 15.0}, {"jitter": 1.2})
+            
+            reference.last_state = None  # Force a full redraw
+            expected = reference.render_frame(*args)
+            actual = cached.render_frame(*args)
+            
+            if not np.array_equal(actual, expected):
+                print(f"✗ Frame {i} differs from a full redraw")
+                return False
+        
+        print(f"✓ {n_frames} frames with an unchanged panel match a full redraw")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Visualizer cache test failed: {e}")
+        return False
+
+
 def test_camera():
     """Test camera access."""
     print("\nTesting camera access...")
@@ -172,6 +263,7 @@ def test_mediapipe():
     
     try:
         import cv2
+        import numpy as np
         import mediapipe as mp
         
         # Create a dummy black image
@@ -201,13 +293,20 @@ def main():
     print("Lie-Dar System - Component Test Suite")
     print("=" * 60)
     
-    results = {
-        "Imports": test_imports(),
-        "Modules": test_modules(),
-        "Logic Engine": test_logic_engine(),
-        "MediaPipe": test_mediapipe(),
-        "Camera": test_camera()
-    }
+    results = {"Imports": test_imports(full=FULL)}
+    if FULL:
+        results["Modules"] = test_modules()
+        results["Visualizer Cache"] = test_visualizer_cache()
+    results["Logic Engine"] = test_logic_engine()
+    results["Alert Levels"] = test_alert_levels()
+    
+    if not FULL:
+        print("\nSkipping full library and module imports (run with --full to include them)")
+    if HARDWARE:
+        results["MediaPipe"] = test_mediapipe()
+        results["Camera"] = test_camera()
+    else:
+        print("\nSkipping MediaPipe and camera tests (run with --hardware to include them)")
     
     print("\n" + "=" * 60)
     print("Test Results Summary")
@@ -223,7 +322,10 @@ def main():
     print("=" * 60)
     
     if all_passed:
-        print("\n✓ All tests passed! System is ready to run.")
+        if FULL:
+            print("\n✓ All tests passed! System is ready to run.")
+        else:
+            print("\n✓ Quick checks passed. Run with --full to verify the installation.")
         print("\nRun the full system with: python main.py")
         return 0
     else: